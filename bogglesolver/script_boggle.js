@@ -8,7 +8,8 @@ async function loadWasm() {
     console.log('WASM module loaded successfully. now');
 
     // Initialize the solver instance after WASM loads
-    const dictionary = await import('./word_list_scrabble_2019.txt'); // Replace with your actual word list
+    // Word list from dictionary.js (games/build_dictionaries.py)
+    const dictionary = typeof DICTIONARY_WORDS !== 'undefined' ? DICTIONARY_WORDS : [];
     const board = ["abcd", "efgh", "ijkl", "mnop"]; // Placeholder, will be replaced by user input
     solverInstance = new wasmModule.BoggleSolver(board, dictionary);
   } catch (error) {
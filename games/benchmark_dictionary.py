@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Compare the dictionary artifacts produced by convert_dictionary.py.
+
+For every output format this builds the artifact into a temporary directory
+and reports its size (raw, gzip and, if installed, brotli) and how long
+Python takes to decode it back into the full word list. Decoding is checked
+against the source list so a broken format can't win the comparison.
+
+    python benchmark_dictionary.py
+    python benchmark_dictionary.py --repeat 5 --json results.json
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+
+import convert_dictionary as cd
+from dawg import Dawg
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def decode_js(data):
+    text = data.decode('utf-8')
+    body = text[text.index('[', text.index('DICTIONARY_WORDS')):text.index('];')]
+    return json.loads(body + ']')
+
+
+def decode_dawg(data):
+    return list(Dawg.from_bytes(data))
+
+
+def decode_dawg_js(data):
+    encoded = re.search(rb'atob\("([^"]*)"\)', data).group(1)
+    return list(Dawg.from_bytes(base64.b64decode(encoded)))
+
+
+def decode_front(data):
+    return list(cd.decode_front_coded(data.decode('utf-8').split('\n')))
+
+
+def decode_front_js(data):
+    literal = re.search(rb'const lines = ("[^"]*")', data).group(1)
+    return list(cd.decode_front_coded(json.loads(literal).split('\n')))
+
+
+DECODERS = {
+    'js': decode_js,
+    'dawg': decode_dawg,
+    'dawg-js': decode_dawg_js,
+    'front': decode_front,
+    'front-js': decode_front_js,
+}
+
+
+def build_artifact(fmt, input_path, output_path, min_length):
+    words = cd.iter_words(input_path, min_length)
+    cd.write_output(fmt, words, output_path, os.path.basename(input_path))
+
+
+def time_call(func, repeat):
+    """Median wall time of `func()` over `repeat` runs, plus its last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def benchmark_format(fmt, input_path, expected, min_length, repeat, workdir):
+    path = os.path.join(workdir, cd.DEFAULT_OUTPUTS[fmt])
+    build_time, _ = time_call(lambda: build_artifact(fmt, input_path, path, min_length), 1)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    decode = DECODERS[fmt]
+    decode_time, words = time_call(lambda: decode(data), repeat)
+    if words != expected:
+        raise AssertionError(f"{fmt}: decoded word list does not match the source")
+
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    gunzip_time, _ = time_call(lambda: decode(gzip.decompress(gz)), repeat)
+
+    result = {
+        'format': fmt,
+        'bytes': len(data),
+        'gzip_bytes': len(gz),
+        'brotli_bytes': None,
+        'build_seconds': build_time,
+        'decode_seconds': decode_time,
+        'gzip_decode_seconds': gunzip_time,
+        'brotli_decode_seconds': None,
+    }
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        result['brotli_bytes'] = len(br)
+        result['brotli_decode_seconds'], _ = time_call(lambda: decode(brotli.decompress(br)), repeat)
+    return result
+
+
+def print_table(results):
+    def kb(value):
+        return '-' if value is None else f'{value / 1024:.0f} KB'
+
+    def ms(value):
+        return '-' if value is None else f'{value * 1000:.0f} ms'
+
+    header = f"{'format':<10}{'raw':>10}{'gzip':>10}{'brotli':>10}{'decode':>10}{'+gunzip':>10}{'+brotli':>10}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['format']:<10}{kb(r['bytes']):>10}{kb(r['gzip_bytes']):>10}{kb(r['brotli_bytes']):>10}"
+              f"{ms(r['decode_seconds']):>10}{ms(r['gzip_decode_seconds']):>10}"
+              f"{ms(r['brotli_decode_seconds']):>10}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dictionary artifact formats')
+    parser.add_argument('-i', '--input', default=cd.DEFAULT_INPUT,
+                        help=f'word list to read (default: {cd.DEFAULT_INPUT})')
+    parser.add_argument('--min-length', type=int, default=cd.DEFAULT_MIN_LENGTH)
+    parser.add_argument('-f', '--format', action='append', choices=sorted(DECODERS),
+                        help='format to benchmark (repeatable, default: all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='decode runs per measurement; the median is reported (default: 3)')
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    formats = args.format or list(DECODERS)
+    expected = list(cd.iter_words(args.input, args.min_length))
+    if brotli is None:
+        print("brotli not installed; skipping brotli columns (pip install brotli)")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in formats:
+            print(f"Benchmarking {fmt}...")
+            results.append(benchmark_format(fmt, args.input, expected, args.min_length,
+                                            args.repeat, workdir))
+
+    print()
+    print_table(results)
+    smallest = min(results, key=lambda r: r['brotli_bytes'] or r['gzip_bytes'])
+    print(f"\nSmallest compressed artifact: {smallest['format']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'words': len(expected), 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
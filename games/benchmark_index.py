@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the word index built by convert_dictionary.py --format index.
+
+Reports how long the one-pass build takes, the artifact sizes, and the time
+per lookup through WordIndex compared with scanning the flat word list:
+words of a length, anagrams of a word, and words formable from a random
+7-tile rack (with and without a blank). Every indexed answer is checked
+against the scan, so a broken index can't win the comparison.
+
+    python benchmark_index.py
+    python benchmark_index.py --queries 50 --json index_results.json
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import random
+from collections import Counter
+
+import convert_dictionary as cd
+from benchmark_dictionary import time_call
+from word_index import BLANK, WordIndex, anagram_key, build_index
+
+# Scrabble tile distribution, used to draw realistic racks
+TILE_BAG = (
+    'a' * 9 + 'b' * 2 + 'c' * 2 + 'd' * 4 + 'e' * 12 + 'f' * 2 + 'g' * 3 + 'h' * 2 + 'i' * 9
+    + 'j' + 'k' + 'l' * 4 + 'm' * 2 + 'n' * 6 + 'o' * 8 + 'p' * 2 + 'q' + 'r' * 6 + 's' * 4
+    + 't' * 6 + 'u' * 4 + 'v' * 2 + 'w' * 2 + 'x' + 'y' * 2 + 'z'
+)
+RACK_SIZE = 7
+
+
+def scan_length(words, length):
+    return [word for word in words if len(word) == length]
+
+
+def scan_anagrams(words, letters):
+    key = anagram_key(letters)
+    return [word for word in words if len(word) == len(key) and anagram_key(word) == key]
+
+
+def scan_formable(words, tiles):
+    blanks = tiles.count(BLANK)
+    rack = Counter(tiles.replace(BLANK, ''))
+    found = []
+    for word in words:
+        if len(word) <= len(tiles) and sum((Counter(word) - rack).values()) <= blanks:
+            found.append(word)
+    return found
+
+
+def by_length(words):
+    """Order a scan's results like WordIndex does: by length, then alphabetically"""
+    return sorted(words, key=lambda word: (len(word), word))
+
+
+def compare(name, queries, indexed, scanned, repeat):
+    """Median time per query of both lookups; raises if any answer differs"""
+    index_time, index_results = time_call(lambda: [indexed(q) for q in queries], repeat)
+    scan_time, scan_results = time_call(lambda: [by_length(scanned(q)) for q in queries], 1)
+    for query, got, expected in zip(queries, index_results, scan_results):
+        if got != expected:
+            raise AssertionError(f"{name}({query!r}): index gives {len(got)} words, scan gives {len(expected)}")
+    return {
+        'query': name,
+        'queries': len(queries),
+        'index_seconds': index_time / len(queries),
+        'scan_seconds': scan_time / len(queries),
+        'results': sum(map(len, index_results)) / len(queries),
+    }
+
+
+def print_table(results):
+    header = f"{'query':<18}{'index':>12}{'scan':>12}{'speedup':>10}{'hits':>8}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['query']:<18}{r['index_seconds'] * 1000:>10.2f}ms{r['scan_seconds'] * 1000:>10.1f}ms"
+              f"{r['scan_seconds'] / r['index_seconds']:>9.0f}x{r['results']:>8.0f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark word index lookups against a list scan')
+    parser.add_argument('-i', '--input', default=cd.DEFAULT_INPUT,
+                        help=f'word list to read (default: {cd.DEFAULT_INPUT})')
+    parser.add_argument('--min-length', type=int, default=cd.DEFAULT_MIN_LENGTH)
+    parser.add_argument('--queries', type=int, default=20,
+                        help='queries of each kind (default: 20)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='indexed runs per measurement; the median is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    words = list(cd.iter_words(args.input, args.min_length))
+
+    build_time, index = time_call(lambda: build_index(cd.iter_words(args.input, args.min_length)), 1)
+    data = index.to_bytes()
+    load_time, index = time_call(lambda: WordIndex.from_bytes(data), args.repeat)
+    if sorted(index) != words:
+        raise AssertionError('index does not hold the source word list')
+    sizes = {
+        'bytes': len(data),
+        'gzip_bytes': len(gzip.compress(data, compresslevel=9, mtime=0)),
+        'js_bytes': len(base64.b64encode(data)),
+    }
+    print(f"{len(index)} words, max length {index.max_length}")
+    print(f"build {build_time * 1000:.0f} ms (one pass), load {load_time * 1000:.1f} ms")
+    print(f"index {sizes['bytes'] / 1024:.0f} KB raw, {sizes['gzip_bytes'] / 1024:.0f} KB gzip, "
+          f"{sizes['js_bytes'] / 1024:.0f} KB as base64 in index-js\n")
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(words, args.queries)
+    racks = [''.join(rng.sample(TILE_BAG, RACK_SIZE)) for _ in range(args.queries)]
+    blank_racks = [rack[:-1] + BLANK for rack in racks]
+    lengths = [len(word) for word in sample]
+
+    results = [
+        compare('words_of_length', lengths, index.words_of_length, lambda n: scan_length(words, n), args.repeat),
+        compare('anagrams', sample, index.anagrams, lambda w: scan_anagrams(words, w), args.repeat),
+        compare('formable', racks, index.formable, lambda r: scan_formable(words, r), args.repeat),
+        compare('formable + blank', blank_racks, index.formable,
+                lambda r: scan_formable(words, r), args.repeat),
+    ]
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'words': len(index), 'build_seconds': build_time, 'load_seconds': load_time,
+                       **sizes, 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Boggle solver built on the Scrabble 2019 word list.
+
+The word list is loaded once into a trie (stored as a minimized DAWG, so
+shared suffixes cost nothing) and every board is solved by depth-first
+search with prefix pruning and an integer bitmask of visited cells. Boards
+can be any N x N size; a cell may hold more than one letter (e.g. "qu").
+
+This is the Python reference for the search in games.js and the engine
+behind offline board generation.
+
+    python boggle_solver.py catx seto dogs abcd
+"""
+
+import argparse
+
+from convert_dictionary import DEFAULT_INPUT, DEFAULT_MIN_LENGTH, iter_words
+from dawg import (
+    ALPHABET, CHILD_MASK, LAST_FLAG, LETTER_MASK, LETTER_SHIFT, WORD_FLAG,
+    Dawg, dawg_from_words,
+)
+
+# Classic Boggle scoring by word length; 8+ letters score 11
+WORD_SCORES = {3: 1, 4: 1, 5: 2, 6: 3, 7: 5}
+LONG_WORD_SCORE = 11
+
+
+def score_word(word):
+    """Points for a single found word"""
+    return WORD_SCORES.get(len(word), LONG_WORD_SCORE if len(word) > 7 else 0)
+
+
+def parse_board(board):
+    """Normalize a board to a square list of lowercase cell strings.
+
+    Accepts a list of row strings ("abcd"), a list of rows of cells
+    (["a", "qu", ...]) or a flat string of N*N single letters.
+    """
+    if isinstance(board, str):
+        letters = board.replace(' ', '').replace('\n', '').lower()
+        size = int(round(len(letters) ** 0.5))
+        if size * size != len(letters):
+            raise ValueError(f"A flat board needs N*N letters, got {len(letters)}")
+        rows = [letters[i * size:(i + 1) * size] for i in range(size)]
+    else:
+        rows = board
+
+    cells = []
+    for row in rows:
+        cells.append([cell.lower() for cell in row])
+    size = len(cells)
+    if any(len(row) != size for row in cells):
+        raise ValueError("Board must be square")
+    return cells
+
+
+_NEIGHBOR_CACHE = {}
+
+
+def neighbors_for(size):
+    """Neighbor cell indexes for every cell of a size x size board"""
+    cached = _NEIGHBOR_CACHE.get(size)
+    if cached is None:
+        cached = []
+        for row in range(size):
+            for col in range(size):
+                adjacent = []
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        r, c = row + dr, col + dc
+                        if (dr or dc) and 0 <= r < size and 0 <= c < size:
+                            adjacent.append(r * size + c)
+                cached.append(tuple(adjacent))
+        _NEIGHBOR_CACHE[size] = cached
+    return cached
+
+
+class BoggleSolver:
+    """Solve boards against a word list loaded once.
+
+    Internally each trie node is a dict mapping a letter to
+    (child node id or -1, is_word), with node 0 as the root.
+    """
+
+    def __init__(self, dawg, min_length=DEFAULT_MIN_LENGTH):
+        self.min_length = min_length
+        self.nodes = self._expand(dawg)
+
+    @classmethod
+    def from_word_list(cls, path=DEFAULT_INPUT, min_length=DEFAULT_MIN_LENGTH):
+        """Build the trie from a plain word list file"""
+        return cls(dawg_from_words(iter_words(path, min_length)), min_length)
+
+    @classmethod
+    def from_dawg(cls, path, min_length=DEFAULT_MIN_LENGTH):
+        """Load a trie written by convert_dictionary.py --format dawg"""
+        return cls(Dawg.load(path), min_length)
+
+    @staticmethod
+    def _expand(dawg):
+        """Turn packed DAWG edges into per-node transition dicts"""
+        edges = dawg.edges
+        if not edges:
+            return [{}]
+        ids = {0: 0}
+        nodes = []
+        pending = [0]
+        while pending:
+            offset = pending.pop()
+            transitions = {}
+            i = offset
+            while True:
+                value = edges[i]
+                child = value & CHILD_MASK
+                child_id = -1
+                if child:
+                    child_id = ids.get(child)
+                    if child_id is None:
+                        child_id = ids[child] = len(ids)
+                        pending.append(child)
+                transitions[ALPHABET[(value >> LETTER_SHIFT) & LETTER_MASK]] = (child_id, bool(value & WORD_FLAG))
+                if value & LAST_FLAG:
+                    break
+                i += 1
+            nodes.append((ids[offset], transitions))
+        ordered = [None] * len(nodes)
+        for node_id, transitions in nodes:
+            ordered[node_id] = transitions
+        return ordered
+
+    def _step(self, node, text):
+        """Follow `text` from `node`; returns (child id, is_word) or None"""
+        nodes = self.nodes
+        result = None
+        for letter in text:
+            if node == -1:
+                return None
+            result = nodes[node].get(letter)
+            if result is None:
+                return None
+            node = result[0]
+        return result
+
+    def solve(self, board):
+        """Return the sorted list of words found on `board`"""
+        cells = [cell for row in parse_board(board) for cell in row]
+        size = int(round(len(cells) ** 0.5))
+        neighbors = neighbors_for(size)
+        min_length = self.min_length
+        step = self._step
+        found = set()
+
+        def visit(cell, node, visited, prefix):
+            result = step(node, cells[cell])
+            if result is None:
+                return
+            child, is_word = result
+            word = prefix + cells[cell]
+            if is_word and len(word) >= min_length:
+                found.add(word)
+            if child == -1:
+                return
+            visited |= 1 << cell
+            for nxt in neighbors[cell]:
+                if not visited >> nxt & 1:
+                    visit(nxt, child, visited, word)
+
+        for cell in range(len(cells)):
+            if cells[cell]:
+                visit(cell, 0, 0, '')
+        return sorted(found)
+
+    def solve_many(self, boards):
+        """Solve an iterable of boards lazily, yielding one word list per board"""
+        for board in boards:
+            yield self.solve(board)
+
+    def __contains__(self, word):
+        result = self._step(0, word.lower())
+        return result is not None and result[1] and len(word) >= self.min_length
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a Boggle board')
+    parser.add_argument('rows', nargs='+', help='board rows, e.g. abcd efgh ijkl mnop')
+    parser.add_argument('-i', '--input', default=DEFAULT_INPUT,
+                        help=f'word list to read (default: {DEFAULT_INPUT})')
+    parser.add_argument('--dawg', help='load a prebuilt DAWG instead of the word list')
+    parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_LENGTH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.dawg:
+        solver = BoggleSolver.from_dawg(args.dawg, args.min_length)
+    else:
+        solver = BoggleSolver.from_word_list(args.input, args.min_length)
+
+    words = solver.solve(args.rows)
+    words.sort(key=lambda w: (-len(w), w))
+    print(f"Found {len(words)} words ({sum(score_word(w) for w in words)} points)")
+    for word in words:
+        print(word)
+
+
+if __name__ == '__main__':
+    main()
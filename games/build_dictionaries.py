@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build every dictionary artifact the pages load from the one canonical word list.
+
+games/word_list_scrabble_2019.txt is the only copy of the Scrabble list. One
+run writes the derived files for both apps:
+
+    games/          every convert_dictionary.py format (dictionary.js,
+                    dictionary-dawg.js, dictionary-index.js, ...)
+    bogglesolver/   dictionary.js, loaded by boggle.html
+
+The build is incremental. games/.dictionary_build/manifest.json records a
+hash of each output's inputs: the word list, the converter code
+(CODE_FILES) and the options. It also records a hash of each output. If
+neither has changed, the run does no work. A missing or edited output is
+rewritten on its own. When the word list changes, it is compared with a
+snapshot of the previously built list, and the added and removed words are
+reported.
+
+    python build_dictionaries.py
+    python build_dictionaries.py --only bogglesolver --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import convert_dictionary as cd
+
+GAMES_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(GAMES_DIR)
+SOURCE = os.path.join(GAMES_DIR, cd.DEFAULT_INPUT)
+STATE_DIR = os.path.join(GAMES_DIR, '.dictionary_build')
+MANIFEST = 'manifest.json'
+# Front-coded copy of the last built word list, for diffing the next one
+SNAPSHOT = 'words.front.txt'
+
+# Formats written for each app, into its directory under the repo root
+TARGETS = {
+    'games': ('games', tuple(cd.DEFAULT_OUTPUTS)),
+    'bogglesolver': ('bogglesolver', ('js',)),
+}
+
+# Modules whose code shapes the artifacts
+CODE_FILES = ('convert_dictionary.py', 'dawg.py', 'word_index.py')
+
+# Added and removed words printed by the change report
+DIFF_PREVIEW = 20
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def inputs_digest(source_hash, min_length):
+    """Hash of everything the artifacts depend on"""
+    digest = hashlib.sha256(source_hash.encode())
+    for name in CODE_FILES:
+        digest.update(file_digest(os.path.join(GAMES_DIR, name)).encode())
+    digest.update(f'min_length={min_length}'.encode())
+    return digest.hexdigest()
+
+
+def planned_outputs(apps):
+    """(format, path relative to the repo root) of every artifact of `apps`"""
+    outputs = []
+    for app in apps:
+        directory, formats = TARGETS[app]
+        for fmt in formats:
+            outputs.append((fmt, os.path.join(directory, cd.DEFAULT_OUTPUTS[fmt])))
+    return outputs
+
+
+def load_manifest(state_dir=STATE_DIR):
+    path = os.path.join(state_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {'source': {}, 'outputs': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, MANIFEST)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def stale_outputs(outputs, manifest, inputs_hash, force=False):
+    """The outputs whose inputs changed, or that are missing or were edited"""
+    stale = []
+    for fmt, relpath in outputs:
+        record = manifest['outputs'].get(relpath)
+        path = os.path.join(ROOT_DIR, relpath)
+        if (force or record is None or record['inputs'] != inputs_hash
+                or not os.path.exists(path) or file_digest(path) != record['sha256']):
+            stale.append((fmt, relpath))
+    return stale
+
+
+def diff_words(old, new):
+    """(added, removed) words going from the list `old` to `new`, each sorted"""
+    old, new = set(old), set(new)
+    return sorted(new - old), sorted(old - new)
+
+
+def build(apps=tuple(TARGETS), source=SOURCE, min_length=cd.DEFAULT_MIN_LENGTH, state_dir=STATE_DIR,
+          force=False):
+    """Bring the artifacts of `apps` up to date.
+
+    Returns a summary dict: the outputs rebuilt and skipped, the source word
+    count, and the words added and removed since the last build (None when
+    the list did not change or there is no snapshot to compare with).
+    """
+    manifest = load_manifest(state_dir)
+    source_hash = file_digest(source)
+    inputs_hash = inputs_digest(source_hash, min_length)
+    outputs = planned_outputs(apps)
+    stale = stale_outputs(outputs, manifest, inputs_hash, force)
+    summary = {
+        'built': [],
+        'skipped': [relpath for output, relpath in outputs if (output, relpath) not in stale],
+        'words': manifest['source'].get('words'),
+        'added': None,
+        'removed': None,
+    }
+    if not stale:
+        return summary
+
+    words = list(cd.iter_words(source, min_length))
+    summary['words'] = len(words)
+    snapshot = os.path.join(state_dir, SNAPSHOT)
+    if manifest['source'].get('sha256') not in (None, source_hash) and os.path.exists(snapshot):
+        with open(snapshot, encoding='utf-8') as f:
+            summary['added'], summary['removed'] = diff_words(cd.decode_front_coded(f), words)
+
+    source_name = os.path.basename(source)
+    # Formats already written this run; other apps get a copy
+    written = {}
+    for fmt, relpath in stale:
+        path = os.path.join(ROOT_DIR, relpath)
+        if fmt in written:
+            shutil.copyfile(written[fmt], path)
+        else:
+            cd.write_output(fmt, words, path, source_name)
+            written[fmt] = path
+        manifest['outputs'][relpath] = {'format': fmt, 'inputs': inputs_hash, 'sha256': file_digest(path)}
+        summary['built'].append(relpath)
+
+    os.makedirs(state_dir, exist_ok=True)
+    cd.write_front_coded(words, snapshot)
+    manifest['source'] = {
+        'path': os.path.relpath(source, ROOT_DIR),
+        'sha256': source_hash,
+        'words': len(words),
+    }
+    save_manifest(manifest, state_dir)
+    return summary
+
+
+def print_diff(added, removed, preview=DIFF_PREVIEW):
+    print(f"Word list changed: {len(added)} added, {len(removed)} removed")
+    for sign, words in (('+', added), ('-', removed)):
+        for word in words[:preview]:
+            print(f"  {sign} {word}")
+        if len(words) > preview:
+            print(f"  {sign} ... {len(words) - preview} more")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(TARGETS), metavar='APP',
+                        help=f"build only these apps ({', '.join(TARGETS)})")
+    parser.add_argument('-i', '--input', default=SOURCE,
+                        help='canonical word list (default: games/word_list_scrabble_2019.txt)')
+    parser.add_argument('--min-length', type=int, default=cd.DEFAULT_MIN_LENGTH,
+                        help=f'shortest word to keep (default: {cd.DEFAULT_MIN_LENGTH})')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every artifact even if its inputs are unchanged')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = time.perf_counter()
+    summary = build(args.only or tuple(TARGETS), args.input, args.min_length, force=args.force)
+    if summary['added'] is not None:
+        print_diff(summary['added'], summary['removed'])
+    for relpath in summary['built']:
+        print(f"Built {relpath} ({os.path.getsize(os.path.join(ROOT_DIR, relpath))} bytes)")
+    print(f"{len(summary['built'])} rebuilt, {len(summary['skipped'])} up to date "
+          f"({summary['words']} words, {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,42 +2,520 @@
 """
 Convert word_list_scrabble_2019.txt to a JavaScript file that can be loaded directly.
 This avoids CORS issues when loading the dictionary.
+
+The word list is streamed through a generator pipeline (read -> normalize ->
+dedupe -> write) so memory use stays flat no matter how large the list grows.
+
+Output formats:
+    js       DICTIONARY_WORDS array of every word (default)
+    dawg     packed DAWG edges as raw little-endian uint32 (see dawg.py)
+    dawg-js  the same DAWG base64-embedded as DICTIONARY_DAWG, a Uint32Array
+    front    front-coded text: each line is the length of the prefix shared
+             with the previous word (one base-36 digit) followed by the rest
+    front-js the front-coded text in a script that decodes it into
+             DICTIONARY_WORDS on load
+    index    length buckets, anagram groups and letter bitmasks packed into
+             one binary file (see word_index.py), built in the same pass
+    index-js the same index base64-embedded as DICTIONARY_INDEX, with
+             wordsOfLength(), anagrams(), formable() and has() lookups
+
+Any output can also be written precompressed with --compress gzip/brotli
+(brotli needs the optional `brotli` package).
+
+This writes one format at a time; build_dictionaries.py regenerates every
+artifact the games and bogglesolver pages load, skipping unchanged ones.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+
+from dawg import dawg_from_words
+from word_index import build_index
+
+DEFAULT_INPUT = 'word_list_scrabble_2019.txt'
+DEFAULT_OUTPUTS = {
+    'js': 'dictionary.js',
+    'dawg': 'dictionary.dawg',
+    'dawg-js': 'dictionary-dawg.js',
+    'front': 'dictionary.front.txt',
+    'front-js': 'dictionary-front.js',
+    'index': 'dictionary.index',
+    'index-js': 'dictionary-index.js',
+}
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'brotli': '.br',
+}
+
+# Shared prefix lengths are written as a single base-36 digit
+FRONT_CODE_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+DEFAULT_MIN_LENGTH = 3
+
+# Number of words joined into a single write() call
+WRITE_CHUNK_SIZE = 4096
+
+
+def read_lines(path):
+    """Yield raw lines from the word list without loading the whole file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line
+
+
+def normalize(lines, min_length=DEFAULT_MIN_LENGTH):
+    """Lowercase and strip each line, dropping words shorter than min_length"""
+    for line in lines:
+        word = line.strip().lower()
+        if len(word) >= min_length:
+            yield word
+
+
+def dedupe(words, assume_sorted=True):
+    """Drop repeated words.
+
+    The Scrabble list is sorted, so duplicates are adjacent and only the
+    previous word has to be remembered. Pass assume_sorted=False for lists
+    in arbitrary order (this keeps a set of every word seen).
+    """
+    if not assume_sorted:
+        seen = set()
+        for word in words:
+            if word not in seen:
+                seen.add(word)
+                yield word
+        return
+
+    previous = None
+    for word in words:
+        if word != previous:
+            yield word
+        previous = word
+
+
+def iter_words(path, min_length=DEFAULT_MIN_LENGTH, assume_sorted=True):
+    """Full read/normalize/dedupe pipeline for a word list file"""
+    return dedupe(normalize(read_lines(path), min_length), assume_sorted)
+
+
+def chunked(items, size=WRITE_CHUNK_SIZE):
+    """Group an iterable into lists of at most `size` items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_dictionary_js(words, output_path, source_name=DEFAULT_INPUT):
+    """Write words as a DICTIONARY_WORDS array, one buffered write per chunk.
+
+    Returns the number of words written.
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('// Scrabble 2019 Word List\n')
+        f.write('// This file contains the dictionary words as a JavaScript array\n')
+        f.write(f'// Generated automatically from {source_name}\n\n')
+        f.write('const DICTIONARY_WORDS = [\n')
+
+        separator = ''
+        for chunk in chunked(words):
+            f.write(separator + ',\n'.join(f'  "{word}"' for word in chunk))
+            separator = ',\n'
+            count += len(chunk)
+
+        f.write('\n];\n\n')
+        f.write('// Export for use\n')
+        f.write('if (typeof window !== "undefined") {\n')
+        f.write('  window.DICTIONARY_WORDS = DICTIONARY_WORDS;\n')
+        f.write('}\n')
+        f.write('if (typeof module !== "undefined" && module.exports) {\n')
+        f.write('  module.exports = DICTIONARY_WORDS;\n')
+        f.write('}\n')
+    return count
+
+
+def write_dawg(words, output_path):
+    """Write the packed DAWG edges as a raw binary file.
+
+    Returns (word count, edge count).
+    """
+    counter = _Counter(words)
+    dawg = dawg_from_words(counter)
+    dawg.save(output_path)
+    return counter.count, len(dawg.edges)
+
+
+def write_dawg_js(words, output_path, source_name=DEFAULT_INPUT):
+    """Write the packed DAWG as a script defining DICTIONARY_DAWG.
+
+    The edges are embedded as base64 and wrapped in a Uint32Array on load, so
+    the browser gets the finished graph without parsing a word array.
+    Returns (word count, edge count).
+    """
+    counter = _Counter(words)
+    dawg = dawg_from_words(counter)
+    encoded = base64.b64encode(dawg.to_bytes()).decode('ascii')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('// Scrabble 2019 Word List (DAWG)\n')
+        f.write('// Packed DAWG edges; see games/dawg.py for the layout\n')
+        f.write(f'// Generated automatically from {source_name}\n\n')
+        f.write('const DICTIONARY_DAWG = (function () {\n')
+        f.write(f'  const raw = atob("{encoded}");\n')
+        f.write('  const bytes = new Uint8Array(raw.length);\n')
+        f.write('  for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);\n')
+        f.write('  return new Uint32Array(bytes.buffer);\n')
+        f.write('})();\n')
+        f.write(f'const DICTIONARY_WORD_COUNT = {counter.count};\n\n')
+        f.write('// Export for use\n')
+        f.write('if (typeof window !== "undefined") {\n')
+        f.write('  window.DICTIONARY_DAWG = DICTIONARY_DAWG;\n')
+        f.write('  window.DICTIONARY_WORD_COUNT = DICTIONARY_WORD_COUNT;\n')
+        f.write('}\n')
+        f.write('if (typeof module !== "undefined" && module.exports) {\n')
+        f.write('  module.exports = DICTIONARY_DAWG;\n')
+        f.write('}\n')
+    return counter.count, len(dawg.edges)
+
+
+def front_code(words):
+    """Yield front-coded lines (shared prefix length digit + suffix)"""
+    previous = ''
+    max_shared = len(FRONT_CODE_DIGITS) - 1
+    for word in words:
+        limit = min(len(word), len(previous), max_shared)
+        shared = 0
+        while shared < limit and word[shared] == previous[shared]:
+            shared += 1
+        yield FRONT_CODE_DIGITS[shared] + word[shared:]
+        previous = word
+
+
+def decode_front_coded(lines):
+    """Yield the words encoded by front_code()"""
+    previous = ''
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        word = previous[:int(line[0], 36)] + line[1:]
+        yield word
+        previous = word
+
+
+def write_front_coded(words, output_path):
+    """Write front-coded lines in buffered chunks. Returns the word count."""
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for chunk in chunked(front_code(words)):
+            f.write('\n'.join(chunk) + '\n')
+            count += len(chunk)
+    return count
+
+
+def write_front_coded_js(words, output_path, source_name=DEFAULT_INPUT):
+    """Write a script that expands front-coded text into DICTIONARY_WORDS.
+
+    The payload is only lowercase letters, digits and newlines, so it is far
+    smaller than a quoted array literal and cheap for the JS parser to skip.
+    Returns the word count.
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('// Scrabble 2019 Word List (front-coded)\n')
+        f.write('// Each line: shared prefix length (base 36) + remaining letters\n')
+        f.write(f'// Generated automatically from {source_name}\n\n')
+        f.write('const DICTIONARY_WORDS = (function () {\n')
+        f.write('  const lines = ')
+        f.write('"')
+        separator = ''
+        for chunk in chunked(front_code(words)):
+            # Payload is [0-9a-z] only; json.dumps adds the \\n escapes
+            f.write(json.dumps(separator + '\n'.join(chunk))[1:-1])
+            separator = '\n'
+            count += len(chunk)
+        f.write('".split("\\n");\n')
+        f.write('  const words = new Array(lines.length);\n')
+        f.write('  let previous = "";\n')
+        f.write('  for (let i = 0; i < lines.length; i++) {\n')
+        f.write('    const line = lines[i];\n')
+        f.write('    previous = previous.slice(0, parseInt(line[0], 36)) + line.slice(1);\n')
+        f.write('    words[i] = previous;\n')
+        f.write('  }\n')
+        f.write('  return words;\n')
+        f.write('})();\n\n')
+        f.write('// Export for use\n')
+        f.write('if (typeof window !== "undefined") {\n')
+        f.write('  window.DICTIONARY_WORDS = DICTIONARY_WORDS;\n')
+        f.write('}\n')
+        f.write('if (typeof module !== "undefined" && module.exports) {\n')
+        f.write('  module.exports = DICTIONARY_WORDS;\n')
+        f.write('}\n')
+    return count
+
+
+def write_index(words, output_path):
+    """Write the length/anagram/bitmask index as a binary file (see word_index.py).
+
+    Returns (word count, index bytes).
+    """
+    index = build_index(words)
+    index.save(output_path)
+    return len(index), os.path.getsize(output_path)
+
+
+# Lookups over the packed index; mirrors WordIndex in word_index.py
+INDEX_JS_QUERIES = """\
+  const header = new Uint32Array(bytes.buffer, 4, 3);
+  const count = header[1], maxLength = header[2];
+  let offset = 16;
+  const view = (size) => {
+    const values = new Uint32Array(bytes.buffer, offset, size);
+    offset += 4 * size;
+    return values;
+  };
+  const lengthOffsets = view(maxLength + 2);
+  const charOffsets = view(maxLength + 2);
+  const masks = view(count);
+  const anagramOrder = view(count);
+  const letters = bytes.subarray(offset);
+
+  function spell(start, length) {
+    return String.fromCharCode.apply(null, letters.subarray(start, start + length));
+  }
+  function word(id) {
+    let length = 0;
+    while (lengthOffsets[length + 1] <= id) length++;
+    return spell(charOffsets[length] + (id - lengthOffsets[length]) * length, length);
+  }
+  function letterMask(text) {
+    let mask = 0;
+    for (let i = 0; i < text.length; i++) mask |= 1 << (text.charCodeAt(i) - 97);
+    return mask;
+  }
+  function anagramKey(text) {
+    return text.split('').sort().join('');
+  }
+  function wordsOfLength(length) {
+    const words = [];
+    if (!(length > 0 && length <= maxLength)) return words;
+    for (let start = charOffsets[length]; start < charOffsets[length + 1]; start += length) {
+      words.push(spell(start, length));
+    }
+    return words;
+  }
+  function has(text) {
+    text = text.toLowerCase();
+    const length = text.length;
+    if (!(length > 0 && length <= maxLength)) return false;
+    let low = 0, high = lengthOffsets[length + 1] - lengthOffsets[length];
+    while (low < high) {
+      const middle = (low + high) >> 1;
+      if (spell(charOffsets[length] + middle * length, length) < text) low = middle + 1;
+      else high = middle;
+    }
+    return low < lengthOffsets[length + 1] - lengthOffsets[length] &&
+      spell(charOffsets[length] + low * length, length) === text;
+  }
+  function anagrams(text) {
+    const key = anagramKey(text.toLowerCase());
+    let low = 0, high = count;
+    while (low < high) {
+      const middle = (low + high) >> 1;
+      if (anagramKey(word(anagramOrder[middle])) < key) low = middle + 1;
+      else high = middle;
+    }
+    const found = [];
+    for (; low < count; low++) {
+      const candidate = word(anagramOrder[low]);
+      if (anagramKey(candidate) !== key) break;
+      found.push(candidate);
+    }
+    return found;
+  }
+  function formable(tiles, minLength = 1) {
+    tiles = tiles.toLowerCase();
+    if (/[^a-z?]/.test(tiles)) throw new Error(`Unsupported characters in rack ${JSON.stringify(tiles)}`);
+    const rack = tiles.replace(/\\?/g, '');
+    const blanks = tiles.length - rack.length;
+    const outside = ~letterMask(rack) & 0x3ffffff;
+    const counts = new Array(26).fill(0);
+    for (let i = 0; i < rack.length; i++) counts[rack.charCodeAt(i) - 97]++;
+    const found = [];
+    const need = new Array(26);
+    for (let length = Math.max(minLength, 1); length <= Math.min(tiles.length, maxLength); length++) {
+      for (let id = lengthOffsets[length]; id < lengthOffsets[length + 1]; id++) {
+        let extra = masks[id] & outside;
+        let bits = 0;
+        while (extra && bits <= blanks) { extra &= extra - 1; bits++; }
+        if (bits > blanks) continue;
+        const start = charOffsets[length] + (id - lengthOffsets[length]) * length;
+        need.fill(0);
+        let missing = 0;
+        for (let i = start; i < start + length; i++) {
+          const letter = letters[i] - 97;
+          if (++need[letter] > counts[letter]) missing++;
+        }
+        if (missing <= blanks) found.push(spell(start, length));
+      }
+    }
+    return found;
+  }
+  return { count, maxLength, word, has, wordsOfLength, anagrams, formable };
 """
 
-print("Reading word list...")
-with open('word_list_scrabble_2019.txt', 'r', encoding='utf-8') as f:
-    words = [line.strip().lower() for line in f if len(line.strip()) >= 3]
 
-print(f"Found {len(words)} valid words (3+ characters)")
+def write_index_js(words, output_path, source_name=DEFAULT_INPUT):
+    """Write the packed index as a script defining DICTIONARY_INDEX.
+
+    The binary index is embedded as base64 and read in place through typed
+    array views; the returned object answers length, anagram and tile-rack
+    queries without building a Set or scanning a word array.
+    Returns (word count, index bytes before base64).
+    """
+    index = build_index(words)
+    data = index.to_bytes()
+    encoded = base64.b64encode(data).decode('ascii')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('// Scrabble 2019 Word List (length, anagram and letter-mask index)\n')
+        f.write('// Packed index; see games/word_index.py for the layout\n')
+        f.write(f'// Generated automatically from {source_name}\n\n')
+        f.write('const DICTIONARY_INDEX = (function () {\n')
+        f.write(f'  const raw = atob("{encoded}");\n')
+        f.write('  const bytes = new Uint8Array(raw.length);\n')
+        f.write('  for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);\n')
+        f.write(INDEX_JS_QUERIES)
+        f.write('})();\n\n')
+        f.write('// Export for use\n')
+        f.write('if (typeof window !== "undefined") {\n')
+        f.write('  window.DICTIONARY_INDEX = DICTIONARY_INDEX;\n')
+        f.write('}\n')
+        f.write('if (typeof module !== "undefined" && module.exports) {\n')
+        f.write('  module.exports = DICTIONARY_INDEX;\n')
+        f.write('}\n')
+    return len(index), len(data)
+
+
+def write_output(fmt, words, output_path, source_name=DEFAULT_INPUT):
+    """Write words in any DEFAULT_OUTPUTS format. Returns the word count."""
+    if fmt == 'js':
+        return write_dictionary_js(words, output_path, source_name)
+    if fmt == 'dawg':
+        return write_dawg(words, output_path)[0]
+    if fmt == 'dawg-js':
+        return write_dawg_js(words, output_path, source_name)[0]
+    if fmt == 'front':
+        return write_front_coded(words, output_path)
+    if fmt == 'front-js':
+        return write_front_coded_js(words, output_path, source_name)
+    if fmt == 'index':
+        return write_index(words, output_path)[0]
+    if fmt == 'index-js':
+        return write_index_js(words, output_path, source_name)[0]
+    raise ValueError(f"Unknown format {fmt!r} (expected one of {sorted(DEFAULT_OUTPUTS)})")
+
+
+def compress_file(path, method):
+    """Write a precompressed copy of `path` next to it and return its path.
+
+    gzip output uses mtime=0 so identical inputs give identical bytes.
+    """
+    output_path = path + COMPRESSION_SUFFIXES[method]
+    with open(path, 'rb') as f:
+        data = f.read()
+    if method == 'gzip':
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    else:
+        try:
+            import brotli
+        except ImportError:
+            raise RuntimeError("brotli compression requires the 'brotli' package (pip install brotli)")
+        compressed = brotli.compress(data, quality=11)
+    with open(output_path, 'wb') as f:
+        f.write(compressed)
+    return output_path
+
+
+class _Counter:
+    """Pass words through while counting them"""
+
+    def __init__(self, words):
+        self.words = words
+        self.count = 0
+
+    def __iter__(self):
+        for word in self.words:
+            self.count += 1
+            yield word
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-i', '--input', default=DEFAULT_INPUT,
+                        help=f'word list to read (default: {DEFAULT_INPUT})')
+    parser.add_argument('-o', '--output',
+                        help='file to write (default depends on --format)')
+    parser.add_argument('-f', '--format', choices=sorted(DEFAULT_OUTPUTS), default='js',
+                        help='output format (default: js)')
+    parser.add_argument('--compress', action='append', choices=sorted(COMPRESSION_SUFFIXES),
+                        default=[], help='also write a precompressed copy (repeatable)')
+    parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_LENGTH,
+                        help=f'shortest word to keep (default: {DEFAULT_MIN_LENGTH})')
+    parser.add_argument('--unsorted', action='store_true',
+                        help='input is not sorted; dedupe with a set instead of adjacent compare')
+    return parser.parse_args(argv)
+
 
-# Create JavaScript file
-print("Creating dictionary.js...")
-with open('dictionary.js', 'w', encoding='utf-8') as f:
-    f.write('// Scrabble 2019 Word List\n')
-    f.write('// This file contains the dictionary words as a JavaScript array\n')
-    f.write('// Generated automatically from word_list_scrabble_2019.txt\n\n')
-    f.write('const DICTIONARY_WORDS = [\n')
-    
-    # Write words in a compact format
-    for i, word in enumerate(words):
-        if i == len(words) - 1:
-            f.write(f'  "{word}"\n')
-        else:
-            f.write(f'  "{word}",\n')
-    
-    f.write('];\n\n')
-    f.write('// Export for use\n')
-    f.write('if (typeof window !== "undefined") {\n')
-    f.write('  window.DICTIONARY_WORDS = DICTIONARY_WORDS;\n')
-    f.write('}\n')
-    f.write('if (typeof module !== "undefined" && module.exports) {\n')
-    f.write('  module.exports = DICTIONARY_WORDS;\n')
-    f.write('}\n')
+def main(argv=None):
+    args = parse_args(argv)
 
-print(f"Created dictionary.js with {len(words)} words")
-print("The dictionary is now available as DICTIONARY_WORDS in JavaScript")
+    output = args.output or DEFAULT_OUTPUTS[args.format]
+    source_name = os.path.basename(args.input)
 
+    print(f"Streaming {args.input} -> {output} ({args.format})...")
+    words = iter_words(args.input, args.min_length, not args.unsorted)
+    if args.unsorted and args.format != 'js':
+        # The DAWG and index builders need sorted input
+        words = iter(sorted(words))
 
+    if args.format == 'dawg':
+        count, edges = write_dawg(words, output)
+        print(f"Created {output} with {count} words in {edges} DAWG edges")
+    elif args.format == 'dawg-js':
+        count, edges = write_dawg_js(words, output, source_name)
+        print(f"Created {output} with {count} words in {edges} DAWG edges")
+        print("The dictionary is now available as DICTIONARY_DAWG in JavaScript")
+    elif args.format == 'index':
+        count, size = write_index(words, output)
+        print(f"Created {output} with {count} words ({size} bytes of indexes)")
+    elif args.format == 'index-js':
+        count, size = write_index_js(words, output, source_name)
+        print(f"Created {output} with {count} words ({size} bytes of indexes)")
+        print("The index is now available as DICTIONARY_INDEX in JavaScript")
+    elif args.format == 'front':
+        count = write_front_coded(words, output)
+        print(f"Created {output} with {count} front-coded words")
+    elif args.format == 'front-js':
+        count = write_front_coded_js(words, output, source_name)
+        print(f"Created {output} with {count} front-coded words")
+        print("The dictionary is now available as DICTIONARY_WORDS in JavaScript")
+    else:
+        count = write_dictionary_js(words, output, source_name)
+        print(f"Created {output} with {count} words ({args.min_length}+ characters)")
+        print("The dictionary is now available as DICTIONARY_WORDS in JavaScript")
 
+    for method in args.compress:
+        compressed = compress_file(output, method)
+        print(f"Created {compressed} ({os.path.getsize(compressed)} bytes, "
+              f"{os.path.getsize(output)} uncompressed)")
 
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Minimized DAWG (directed acyclic word graph) for the Scrabble word list.
+
+A DAWG is a trie whose identical suffix subtrees are shared, so the ~280k
+word list collapses into a small graph. The graph is packed into a flat
+array of 32-bit edges that the browser can wrap in a Uint32Array and walk
+directly, with no Set building at page load.
+
+Edge layout (little-endian uint32):
+
+    bit  31     last edge of its node
+    bit  30     end of word (the path ending with this edge is a word)
+    bits 25-29  letter index, 'a' = 0 ... 'z' = 25
+    bits 0-24   index of the child node's first edge (0 = no children)
+
+The root node's edges start at index 0. Edges of a node are contiguous and
+sorted by letter.
+"""
+
+import sys
+from array import array
+
+LAST_FLAG = 1 << 31
+WORD_FLAG = 1 << 30
+LETTER_SHIFT = 25
+LETTER_MASK = 0x1F
+CHILD_MASK = (1 << LETTER_SHIFT) - 1
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+
+class _BuildNode:
+    __slots__ = ('final', 'edges', 'id')
+
+    def __init__(self):
+        self.final = False
+        self.edges = {}
+        self.id = None
+
+    def key(self):
+        return (self.final, tuple((letter, child.id) for letter, child in self.edges.items()))
+
+
+def build_dawg(words):
+    """Build a minimized DAWG from words in sorted order.
+
+    Uses the incremental algorithm of Daciuk et al.: only the path of the
+    most recent word stays unminimized, so memory is bounded by the size of
+    the final graph rather than by a full trie. Returns the root build node.
+    """
+    root = _BuildNode()
+    register = {}
+    unchecked = []
+    previous = ''
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            key = child.key()
+            existing = register.get(key)
+            if existing is not None:
+                parent.edges[letter] = existing
+            else:
+                child.id = len(register)
+                register[key] = child
+
+    for word in words:
+        if word < previous:
+            raise ValueError(f"DAWG input must be sorted: {word!r} follows {previous!r}")
+        if word == previous:
+            continue
+        for letter in word:
+            if letter not in ALPHABET:
+                raise ValueError(f"Unsupported character {letter!r} in {word!r}")
+
+        common = 0
+        limit = min(len(word), len(previous))
+        while common < limit and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+
+        node = unchecked[-1][2] if unchecked else root
+        for letter in word[common:]:
+            child = _BuildNode()
+            node.edges[letter] = child
+            unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        previous = word
+
+    minimize(0)
+    return root
+
+
+def pack_dawg(root):
+    """Pack a built DAWG into an array('I') of edges"""
+    if not root.edges:
+        return array('I')
+
+    # Nodes that differ only in their own final flag have identical edge
+    # blocks once the flag moves onto the incoming edge, so share them.
+    def block_key(node):
+        return tuple((letter, child.final, child.id) for letter, child in node.edges.items())
+
+    offsets = {}
+    order = []
+    next_offset = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        key = block_key(node)
+        if not node.edges or key in offsets:
+            continue
+        offsets[key] = next_offset
+        next_offset += len(node.edges)
+        order.append(node)
+        stack.extend(reversed(list(node.edges.values())))
+
+    if next_offset > CHILD_MASK:
+        raise ValueError(f"DAWG has {next_offset} edges; the packed format holds at most {CHILD_MASK}")
+
+    edges = array('I', bytes(4 * next_offset))
+    for node in order:
+        index = offsets[block_key(node)]
+        items = list(node.edges.items())
+        for position, (letter, child) in enumerate(items):
+            value = (ord(letter) - 97) << LETTER_SHIFT
+            if child.edges:
+                value |= offsets[block_key(child)]
+            if child.final:
+                value |= WORD_FLAG
+            if position == len(items) - 1:
+                value |= LAST_FLAG
+            edges[index + position] = value
+    return edges
+
+
+def dawg_from_words(words):
+    """Build and pack a DAWG in one step"""
+    return Dawg(pack_dawg(build_dawg(words)))
+
+
+class Dawg:
+    """Read-only lookups over a packed DAWG edge array.
+
+    This is the Python reference for the traversal done in games.js, used to
+    check a generated artifact against the source word list.
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+
+    @classmethod
+    def from_bytes(cls, data):
+        edges = array('I')
+        edges.frombytes(data)
+        if sys.byteorder == 'big':
+            edges.byteswap()
+        return cls(edges)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def to_bytes(self):
+        edges = array('I', self.edges)
+        if sys.byteorder == 'big':
+            edges.byteswap()
+        return edges.tobytes()
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    def find_edge(self, node, letter):
+        """Index of the edge leaving `node` for `letter`, or -1"""
+        if not self.edges:
+            return -1
+        target = ord(letter) - 97
+        edges = self.edges
+        i = node
+        while True:
+            value = edges[i]
+            current = (value >> LETTER_SHIFT) & LETTER_MASK
+            if current == target:
+                return i
+            if current > target or value & LAST_FLAG:
+                return -1
+            i += 1
+
+    def _walk(self, text):
+        """Edge index reached by spelling `text` from the root, or -1"""
+        edge = -1
+        node = 0
+        for letter in text:
+            if edge != -1:
+                node = self.edges[edge] & CHILD_MASK
+                if node == 0:
+                    return -1
+            edge = self.find_edge(node, letter)
+            if edge == -1:
+                return -1
+        return edge
+
+    def __contains__(self, word):
+        if not word:
+            return False
+        edge = self._walk(word)
+        return edge != -1 and bool(self.edges[edge] & WORD_FLAG)
+
+    def has_prefix(self, prefix):
+        """True if some word starts with `prefix`"""
+        return not prefix or self._walk(prefix) != -1
+
+    def __iter__(self):
+        """Yield every word in sorted order"""
+        if not self.edges:
+            return
+        edges = self.edges
+        # (edge index, prefix spelled before that edge)
+        stack = [(0, '')]
+        while stack:
+            i, prefix = stack.pop()
+            value = edges[i]
+            word = prefix + ALPHABET[(value >> LETTER_SHIFT) & LETTER_MASK]
+            # Push the next sibling first so the child subtree is visited
+            # before it, keeping the output sorted.
+            if not value & LAST_FLAG:
+                stack.append((i + 1, prefix))
+            child = value & CHILD_MASK
+            if child:
+                stack.append((child, word))
+            if value & WORD_FLAG:
+                yield word
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -44,12 +44,16 @@ document.addEventListener('DOMContentLoaded', function() {
 // Boggle Game Logic
 let dictionary = new Set();
 let prefixes = new Set();
+let dawg = null;
+let boardPool = [];
+let pooledWords = null; // Pre-solved words for the current board, if it came from the pool
 let board = [];
 let lastWords = [];
 const directions = [[-1, -1], [-1, 0], [-1, 1], [0, -1], [0, 1], [1, -1], [1, 0], [1, 1]];
 
 function initializeBoggle() {
     loadDictionary();
+    loadBoardPool();
     generateBoard();
     document.getElementById('generate-btn').onclick = generateBoard;
     document.getElementById('solve-btn').onclick = solveBoggle;
@@ -61,7 +65,14 @@ function initializeBoggle() {
 }
 
 function loadDictionary() {
-    // Dictionary is loaded via script tag, so DICTIONARY_WORDS should be available
+    // Dictionary is loaded via script tag: either a packed DAWG (DICTIONARY_DAWG,
+    // from convert_dictionary.py --format dawg-js) or a flat DICTIONARY_WORDS array
+    if (typeof DICTIONARY_DAWG !== 'undefined') {
+        dawg = DICTIONARY_DAWG;
+        console.log('Dictionary loaded:', typeof DICTIONARY_WORD_COUNT !== 'undefined' ? DICTIONARY_WORD_COUNT : dawg.length + ' edges', 'words (DAWG)');
+        return;
+    }
+
     if (typeof DICTIONARY_WORDS === 'undefined') {
         console.error('Dictionary not loaded. Make sure dictionary.js is included before games.js');
         alert('Dictionary file not loaded. Please ensure dictionary.js is included in the page.');
@@ -82,12 +93,47 @@ function loadDictionary() {
     console.log('Dictionary loaded:', dictionary.size, 'words');
 }
 
+function loadBoardPool() {
+    // Optional pool of pre-solved boards written by generate_boards.py
+    fetch('boards.json')
+        .then(response => response.ok ? response.json() : null)
+        .then(data => {
+            if (data && Array.isArray(data.boards)) {
+                boardPool = data.boards;
+                console.log('Board pool loaded:', boardPool.length, 'boards');
+            }
+        })
+        .catch(() => {
+            // No pool (or opened from file://); boards are generated randomly
+        });
+}
+
+// DAWG edge layout (see games/dawg.py): bit 31 = last edge of node,
+// bit 30 = end of word, bits 25-29 = letter, bits 0-24 = child node index
+const DAWG_LAST = 0x80000000;
+const DAWG_WORD = 0x40000000;
+const DAWG_CHILD_MASK = 0x1FFFFFF;
+
+function dawgFindEdge(node, letter) {
+    // Returns the edge index leaving `node` for `letter`, or -1
+    const target = letter.charCodeAt(0) - 97;
+    for (let i = node; ; i++) {
+        const edge = dawg[i];
+        const current = (edge >>> 25) & 31;
+        if (current === target) return i;
+        if (current > target || (edge & DAWG_LAST)) return -1;
+    }
+}
+
 function generateBoard() {
     const size = parseInt(document.getElementById('board-size').value, 10);
     const tbl = document.getElementById('boggle-board');
     tbl.innerHTML = '';
     board = Array.from({ length: size }, () => Array(size).fill(''));
     const alpha = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ';
+    const candidates = boardPool.filter(b => b.size === size);
+    const pooled = candidates.length ? candidates[Math.floor(Math.random() * candidates.length)] : null;
+    pooledWords = pooled ? pooled.words : null;
     for (let i = 0; i < size; i++) {
         const row = tbl.insertRow();
         for (let j = 0; j < size; j++) {
@@ -96,12 +142,13 @@ function generateBoard() {
             const inp = document.createElement('input');
             inp.type = 'text';
             inp.maxLength = 1;
-            const letter = alpha[Math.floor(Math.random() * 26)];
+            const letter = pooled ? pooled.letters[i][j].toUpperCase() : alpha[Math.floor(Math.random() * 26)];
             inp.value = letter;
             inp.oninput = () => {
                 const val = inp.value.toUpperCase().slice(0, 1);
                 inp.value = val;
                 board[i][j] = val.toLowerCase();
+                pooledWords = null; // Board was edited, so it must be solved again
             };
             board[i][j] = letter.toLowerCase();
             cell.appendChild(inp);
@@ -130,11 +177,18 @@ function updateBoardFromInputs() {
 }
 
 function solveBoggle() {
+    // Pooled boards were solved offline; use their word list as-is
+    if (pooledWords) {
+        lastWords = pooledWords.slice().sort((a, b) => b.length - a.length || a.localeCompare(b));
+        displayResults(lastWords);
+        return;
+    }
+
     // Update board from current input values before solving
     updateBoardFromInputs();
     
     const size = board.length;
-    if (size === 0 || dictionary.size === 0) {
+    if (size === 0 || (dictionary.size === 0 && !dawg)) {
         console.error('Board is empty or dictionary not loaded');
         alert('Please generate a board first and ensure the dictionary is loaded.');
         return;
@@ -159,11 +213,39 @@ function solveBoggle() {
         }
         visited[x][y] = false;
     }
+
+    // Same search, but walking the DAWG: `node` is the first edge of the
+    // node reached by `path`, so each step is a short scan instead of a Set lookup
+    function dfsDawg(x, y, path, node) {
+        if (x < 0 || y < 0 || x >= size || y >= size) return;
+        if (visited[x][y]) return;
+        const letter = board[x][y].toLowerCase();
+        if (!letter) return; // Skip empty cells
+
+        const edgeIndex = dawgFindEdge(node, letter);
+        if (edgeIndex === -1) return;
+        const edge = dawg[edgeIndex];
+        const word = path + letter;
+        if (word.length >= 3 && (edge & DAWG_WORD)) {
+            found.add(word);
+        }
+        const child = edge & DAWG_CHILD_MASK;
+        if (child === 0) return;
+        visited[x][y] = true;
+        for (let [dx, dy] of directions) {
+            dfsDawg(x + dx, y + dy, word, child);
+        }
+        visited[x][y] = false;
+    }
     
     for (let i = 0; i < size; i++) {
         for (let j = 0; j < size; j++) {
             if (board[i][j]) {
-                dfs(i, j, '');
+                if (dawg) {
+                    dfsDawg(i, j, '', 0);
+                } else {
+                    dfs(i, j, '');
+                }
             }
         }
     }
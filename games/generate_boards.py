@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Pre-generate pools of high-quality Boggle boards for the games page.
+
+Boards are sampled with English letter frequencies, solved against the
+shared dictionary and ranked by score. Solving runs in a process pool:
+the solver is built once in the parent and inherited by forked workers
+(copy-on-write), so the trie is never pickled per task. On platforms
+without fork each worker loads the dictionary once in its initializer.
+
+The result is a JSON file that games.js loads to hand out boards with
+their word lists already solved.
+
+    python generate_boards.py --sizes 4 5 --count 20000 --per-band 50
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from boggle_solver import BoggleSolver, score_word
+from convert_dictionary import DEFAULT_INPUT, DEFAULT_MIN_LENGTH
+
+DEFAULT_OUTPUT = 'boards.json'
+
+# Relative letter frequencies used to sample cells
+LETTER_WEIGHTS = {
+    'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0,
+    'h': 6.1, 'i': 7.0, 'j': 0.15, 'k': 0.77, 'l': 4.0, 'm': 2.4, 'n': 6.7,
+    'o': 7.5, 'p': 1.9, 'q': 0.095, 'r': 6.0, 's': 6.3, 't': 9.1, 'u': 2.8,
+    'v': 0.98, 'w': 2.4, 'x': 0.15, 'y': 2.0, 'z': 0.074,
+}
+
+# Difficulty bands by number of words on the board: (name, min words)
+DIFFICULTY_BANDS = [
+    ('easy', 150),
+    ('medium', 60),
+    ('hard', 20),
+]
+
+BATCH_SIZE = 250
+
+# Solver shared with workers; set in the parent before the pool forks
+_SOLVER = None
+
+
+def band_for(word_count):
+    """Difficulty band name for a board with `word_count` words, or None"""
+    for name, minimum in DIFFICULTY_BANDS:
+        if word_count >= minimum:
+            return name
+    return None
+
+
+def sample_board(rng, size):
+    """Random size x size board as a list of row strings"""
+    letters = rng.choices(list(LETTER_WEIGHTS), weights=list(LETTER_WEIGHTS.values()), k=size * size)
+    return [''.join(letters[row * size:(row + 1) * size]) for row in range(size)]
+
+
+def _init_worker(word_list, dawg_path, min_length):
+    """Load the solver in a spawned worker (fork workers inherit it)"""
+    global _SOLVER
+    if _SOLVER is None:
+        _SOLVER = load_solver(word_list, dawg_path, min_length)
+
+
+def _solve_batch(task):
+    """Sample and solve one batch of boards in a worker"""
+    seed, size, count, min_words = task
+    rng = random.Random(seed)
+    results = []
+    for _ in range(count):
+        board = sample_board(rng, size)
+        words = _SOLVER.solve(board)
+        if len(words) < min_words:
+            continue
+        results.append({
+            'size': size,
+            'letters': board,
+            'word_count': len(words),
+            'score': sum(score_word(w) for w in words),
+            'words': words,
+        })
+    return results
+
+
+def load_solver(word_list, dawg_path, min_length):
+    if dawg_path:
+        return BoggleSolver.from_dawg(dawg_path, min_length)
+    return BoggleSolver.from_word_list(word_list, min_length)
+
+
+def generate(sizes, count, seed, workers, min_words, word_list, dawg_path, min_length):
+    """Solve `count` sampled boards per size across a process pool.
+
+    Returns every board with at least `min_words` words.
+    """
+    global _SOLVER
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    if context.get_start_method() == 'fork':
+        _SOLVER = load_solver(word_list, dawg_path, min_length)
+        # Move the trie out of the collector's generations so forked workers
+        # don't dirty (and copy) its pages on every GC pass
+        gc.freeze()
+
+    tasks = []
+    for size in sizes:
+        for start in range(0, count, BATCH_SIZE):
+            tasks.append((seed * 1_000_003 + size * 10_007 + start, size,
+                          min(BATCH_SIZE, count - start), min_words))
+
+    boards = []
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(word_list, dawg_path, min_length)) as pool:
+        for batch in pool.imap_unordered(_solve_batch, tasks):
+            boards.extend(batch)
+    return boards
+
+
+def select_boards(boards, per_band):
+    """Keep the top-scoring `per_band` distinct boards for each size and band"""
+    pools = {}
+    seen = set()
+    for board in sorted(boards, key=lambda b: (-b['score'], b['letters'])):
+        key = tuple(board['letters'])
+        band = band_for(board['word_count'])
+        if band is None or key in seen:
+            continue
+        bucket = pools.setdefault((board['size'], band), [])
+        if len(bucket) < per_band:
+            board['band'] = band
+            bucket.append(board)
+            seen.add(key)
+    return [board for key in sorted(pools) for board in pools[key]]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-generate ranked Boggle boards')
+    parser.add_argument('-i', '--input', default=DEFAULT_INPUT,
+                        help=f'word list to read (default: {DEFAULT_INPUT})')
+    parser.add_argument('--dawg', help='load a prebuilt DAWG instead of the word list')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT,
+                        help=f'JSON file to write (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 5],
+                        help='board sizes to generate (default: 4 5)')
+    parser.add_argument('--count', type=int, default=10000,
+                        help='boards sampled per size (default: 10000)')
+    parser.add_argument('--per-band', type=int, default=50,
+                        help='boards kept per size and difficulty band (default: 50)')
+    parser.add_argument('--min-words', type=int, default=DIFFICULTY_BANDS[-1][1],
+                        help='discard boards with fewer words')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_LENGTH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"Solving {args.count} boards per size {args.sizes} on {args.workers} workers...")
+    start = time.perf_counter()
+    boards = generate(args.sizes, args.count, args.seed, args.workers, args.min_words,
+                      args.input, args.dawg, args.min_length)
+    elapsed = time.perf_counter() - start
+    total = args.count * len(args.sizes)
+    print(f"Solved {total} boards in {elapsed:.1f}s ({total / elapsed:.0f} boards/s)")
+
+    selected = select_boards(boards, args.per_band)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'min_length': args.min_length,
+            'bands': dict(DIFFICULTY_BANDS),
+            'boards': selected,
+        }, f, separators=(',', ':'))
+
+    for size in args.sizes:
+        counts = {band: sum(1 for b in selected if b['size'] == size and b['band'] == band)
+                  for band, _ in DIFFICULTY_BANDS}
+        print(f"  {size}x{size}: " + ', '.join(f"{n} {band}" for band, n in counts.items()))
+    print(f"Wrote {len(selected)} boards to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
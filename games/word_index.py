@@ -0,0 +1,247 @@
+"""
+Secondary indexes over the Scrabble word list for length, anagram and
+"which words can these tiles spell" lookups.
+
+build_index() makes every index in one pass over the sorted word stream.
+Words get ids length-major (every 3-letter word, then every 4-letter word,
+...) and alphabetical within a length. That way a length bucket is a
+contiguous id range, and a word's letters sit at a computable offset with
+no per-word pointer. Everything packs into one little-endian file:
+
+    magic 'WIDX', then uint32 version, word count N and max length M
+    uint32 length_offsets[M + 2]  ids of length L run from length_offsets[L]
+                                  up to length_offsets[L + 1]
+    uint32 char_offsets[M + 2]    offset in `letters` of the first word of
+                                  each length
+    uint32 masks[N]               bit i set if the word contains 'a' + i
+    uint32 anagram_order[N]       word ids ordered by sorted-letter key, so
+                                  the anagrams of a word are one run
+    letters                       every word's letters in id order, ASCII
+
+A word can only be spelled from a rack of tiles if its mask has no bit
+outside the rack's mask. formable() applies that integer test to the whole
+length bucket and counts letters only for the few words that pass.
+"""
+
+import sys
+from array import array
+from bisect import bisect_right
+
+MAGIC = b'WIDX'
+VERSION = 1
+
+# Rack tile that stands for any letter
+BLANK = '?'
+
+LETTER_BITS = {chr(97 + i): 1 << i for i in range(26)}
+
+
+def letter_mask(word):
+    """26-bit signature of the letters in `word` ('a' = bit 0)"""
+    mask = 0
+    for letter in set(word):
+        mask |= LETTER_BITS[letter]
+    return mask
+
+
+def anagram_key(word):
+    """Letters of `word` in sorted order; anagrams share it"""
+    return ''.join(sorted(word))
+
+
+def build_index(words):
+    """Build a WordIndex from words in sorted order, reading them once"""
+    buckets = {}
+    masks = {}
+    # Anagram key and (length, position in bucket) of each word, in input order
+    keys = []
+    places = []
+    previous = ''
+    for word in words:
+        if word < previous:
+            raise ValueError(f"Index input must be sorted: {word!r} follows {previous!r}")
+        if word == previous:
+            continue
+        if not word.isascii() or not word.isalpha() or not word.islower():
+            raise ValueError(f"Unsupported characters in {word!r}")
+        length = len(word)
+        if length not in buckets:
+            buckets[length] = bytearray()
+            masks[length] = array('I')
+        keys.append(anagram_key(word))
+        places.append((length, len(masks[length])))
+        buckets[length] += word.encode('ascii')
+        masks[length].append(letter_mask(word))
+        previous = word
+
+    max_length = max(buckets, default=0)
+    length_offsets = array('I', [0] * (max_length + 2))
+    char_offsets = array('I', [0] * (max_length + 2))
+    for length in range(max_length + 1):
+        count = len(masks.get(length, ()))
+        length_offsets[length + 1] = length_offsets[length] + count
+        char_offsets[length + 1] = char_offsets[length] + count * length
+
+    all_masks = array('I')
+    letters = bytearray()
+    for length in sorted(buckets):
+        all_masks.extend(masks[length])
+        letters += buckets[length]
+
+    # Input order is id order within a length, so a stable sort keeps ids
+    # ascending within a run
+    ids = [length_offsets[length] + position for length, position in places]
+    anagram_order = array('I', [ids[i] for i in sorted(range(len(keys)), key=keys.__getitem__)])
+    return WordIndex(length_offsets, char_offsets, all_masks, anagram_order, bytes(letters))
+
+
+class WordIndex:
+    """Length, anagram and tile-rack lookups over a packed index.
+
+    Python reference for the DICTIONARY_INDEX script written by
+    convert_dictionary.py --format index-js.
+    """
+
+    def __init__(self, length_offsets, char_offsets, masks, anagram_order, letters):
+        self.length_offsets = length_offsets
+        self.char_offsets = char_offsets
+        self.masks = masks
+        self.anagram_order = anagram_order
+        self.letters = letters
+        self.max_length = len(length_offsets) - 2
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError('Not a word index (bad magic)')
+        header = array('I')
+        header.frombytes(data[4:16])
+        if sys.byteorder == 'big':
+            header.byteswap()
+        version, n_words, max_length = header
+        if version != VERSION:
+            raise ValueError(f"Unsupported word index version {version}")
+
+        offset = 16
+        arrays = []
+        for count in (max_length + 2, max_length + 2, n_words, n_words):
+            values = array('I')
+            values.frombytes(data[offset:offset + 4 * count])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            arrays.append(values)
+            offset += 4 * count
+        return cls(*arrays, bytes(data[offset:]))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def to_bytes(self):
+        header = array('I', [VERSION, len(self), self.max_length])
+        parts = [MAGIC]
+        for values in (header, self.length_offsets, self.char_offsets, self.masks, self.anagram_order):
+            values = array('I', values)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            parts.append(values.tobytes())
+        parts.append(self.letters)
+        return b''.join(parts)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    def __len__(self):
+        return len(self.masks)
+
+    def word(self, word_id):
+        """The word with id `word_id`"""
+        length = bisect_right(self.length_offsets, word_id) - 1
+        start = self.char_offsets[length] + (word_id - self.length_offsets[length]) * length
+        return self.letters[start:start + length].decode('ascii')
+
+    def __iter__(self):
+        """Yield every word, shortest first and alphabetical within a length"""
+        for length in range(self.max_length + 1):
+            yield from self.words_of_length(length)
+
+    def words_of_length(self, length):
+        """Every word with `length` letters, in alphabetical order"""
+        if not 0 < length <= self.max_length:
+            return []
+        start, end = self.char_offsets[length], self.char_offsets[length + 1]
+        text = self.letters[start:end].decode('ascii')
+        return [text[i:i + length] for i in range(0, len(text), length)]
+
+    def __contains__(self, word):
+        length = len(word)
+        if not 0 < length <= self.max_length:
+            return False
+        target = word.lower().encode('ascii', 'replace')
+        base = self.char_offsets[length]
+        size = self.length_offsets[length + 1] - self.length_offsets[length]
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            start = base + middle * length
+            if self.letters[start:start + length] < target:
+                low = middle + 1
+            else:
+                high = middle
+        start = base + low * length
+        return low < size and self.letters[start:start + length] == target
+
+    def anagrams(self, letters):
+        """Words spelled with exactly these letters, in alphabetical order"""
+        key = anagram_key(letters.lower())
+        order = self.anagram_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if anagram_key(self.word(order[middle])) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < len(order):
+            word = self.word(order[low])
+            if anagram_key(word) != key:
+                break
+            found.append(word)
+            low += 1
+        return found
+
+    def formable(self, tiles, min_length=1):
+        """Words that can be spelled from the rack `tiles`, each tile used once.
+
+        BLANK ('?') tiles stand for any letter; any other character but a
+        letter raises ValueError. Results are grouped by length, shortest
+        first, alphabetical within a length.
+        """
+        tiles = tiles.lower()
+        blanks = tiles.count(BLANK)
+        rack = tiles.replace(BLANK, '')
+        if rack and not (rack.isascii() and rack.isalpha()):
+            raise ValueError(f"Unsupported characters in rack {tiles!r}")
+        outside = ~letter_mask(rack) & ((1 << 26) - 1)
+        counts = {letter: rack.count(letter) for letter in set(rack)}
+        masks = self.masks
+        found = []
+        for length in range(max(min_length, 1), min(len(tiles), self.max_length) + 1):
+            start, end = self.length_offsets[length], self.length_offsets[length + 1]
+            if blanks:
+                ids = [i for i in range(start, end) if bin(masks[i] & outside).count('1') <= blanks]
+            else:
+                ids = [i for i in range(start, end) if not masks[i] & outside]
+            base = self.char_offsets[length] - start * length
+            for word_id in ids:
+                begin = base + word_id * length
+                word = self.letters[begin:begin + length].decode('ascii')
+                missing = 0
+                for letter in set(word):
+                    missing += max(0, word.count(letter) - counts.get(letter, 0))
+                if missing <= blanks:
+                    found.append(word)
+        return found
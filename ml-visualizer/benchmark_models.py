@@ -0,0 +1,178 @@
+"""
+Build-time benchmark and regression check for the exported models
+
+For every model in train_models.MODEL_SPECS this records, as the median of
+--repeat runs:
+
+    train_seconds        fit the model and build its export dict
+    export_seconds       write the JSON export (json_stream.write_json)
+    json_bytes           size of the JSON file, and gzip_bytes compressed
+    parse_seconds        json.loads() of the file
+    load_seconds         inference.load_model() on the parsed dict
+    rows_per_second      batched inference.predict() throughput
+
+Results go to a JSON file. With --compare, the run is checked against a
+stored baseline and exits with status 1 if any metric regressed past its
+threshold.
+
+    python benchmark_models.py --output baseline.json
+    python benchmark_models.py --compare baseline.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import sklearn
+
+from inference import load_model
+from json_stream import write_json
+from train_models import MODEL_SPECS, build_estimator, load_datasets, train_model
+
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+# Metrics where a larger value is an improvement; all others are costs
+HIGHER_IS_BETTER = {'rows_per_second'}
+SIZE_METRICS = {'json_bytes', 'gzip_bytes'}
+
+# Timing changes smaller than this are noise, whatever the ratio
+MIN_SECONDS_DELTA = 0.005
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def benchmark_model(name, dataset, batch, workdir, rng):
+    """One measurement of every metric for a model"""
+    (model_data, _, _), train_seconds = _timed(lambda: train_model(name, dataset, build_estimator(name)))
+
+    path = os.path.join(workdir, f'{name}_model.json')
+    _, export_seconds = _timed(lambda: write_json(model_data, path))
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    parsed, parse_seconds = _timed(lambda: json.loads(raw))
+    model, load_seconds = _timed(lambda: load_model(parsed))
+
+    X = np.asarray(parsed['sample_data']['X'], dtype=np.float64)
+    rows = X[rng.integers(0, len(X), batch)] + rng.normal(0, 0.01, (batch, X.shape[1]))
+    _, predict_seconds = _timed(lambda: model.predict(rows))
+
+    return {
+        'train_seconds': train_seconds,
+        'export_seconds': export_seconds,
+        'json_bytes': len(raw),
+        'gzip_bytes': len(gzip.compress(raw, mtime=0)),
+        'parse_seconds': parse_seconds,
+        'load_seconds': load_seconds,
+        'rows_per_second': batch / predict_seconds,
+    }
+
+def run_benchmarks(names, batch, repeat, dataset_dir=None):
+    """{model name: {metric: median over repeat runs}}"""
+    datasets = load_datasets(sorted({MODEL_SPECS[name].dataset for name in names}), dataset_dir)
+    rng = np.random.default_rng(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            print(f"Benchmarking {name}...")
+            runs = [benchmark_model(name, datasets[MODEL_SPECS[name].dataset], batch, workdir, rng)
+                    for _ in range(repeat)]
+            results[name] = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+    return results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+def compare_results(baseline, current, threshold, size_threshold):
+    """Regressions of current vs baseline as (model, metric, old, new) tuples"""
+    regressions = []
+    for name, metrics in current.items():
+        for metric, new in metrics.items():
+            old = baseline.get(name, {}).get(metric)
+            if old is None:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = new < old * (1.0 - threshold)
+            elif metric in SIZE_METRICS:
+                regressed = new > old * (1.0 + size_threshold)
+            else:
+                regressed = new > old * (1.0 + threshold) and new - old > MIN_SECONDS_DELTA
+            if regressed:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+def print_table(results):
+    print(f"{'model':<22}{'train ms':>10}{'export ms':>11}{'bytes':>10}{'gzip':>9}"
+          f"{'parse ms':>10}{'load ms':>9}{'rows/s':>14}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['train_seconds'] * 1000:>10.1f}{r['export_seconds'] * 1000:>11.1f}"
+              f"{r['json_bytes']:>10}{r['gzip_bytes']:>9}{r['parse_seconds'] * 1000:>10.2f}"
+              f"{r['load_seconds'] * 1000:>9.2f}{r['rows_per_second']:>14,.0f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark model training, export size, loading and inference')
+    parser.add_argument('--only', nargs='+', choices=list(MODEL_SPECS), metavar='MODEL',
+                        help='benchmark only these models (default: all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per model; the median is reported (default: 3)')
+    parser.add_argument('--batch', type=int, default=100000,
+                        help='rows per inference batch (default: 100000)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'where to write the results (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--dataset-dir', default=None,
+                        help='offline dataset cache (default: .dataset_cache/)')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='fail if any metric regressed against this results file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative slowdown for timings and throughput (default: 0.25)')
+    parser.add_argument('--size-threshold', type=float, default=0.05,
+                        help='allowed relative growth of artifact sizes (default: 0.05)')
+    args = parser.parse_args(argv)
+    if args.compare and os.path.realpath(args.compare) == os.path.realpath(args.output):
+        parser.error('--compare and --output are the same file; the run would overwrite its own baseline')
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.only or list(MODEL_SPECS)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run_benchmarks(names, args.batch, args.repeat, args.dataset_dir)
+
+    print()
+    print_table(results)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'batch': args.batch, 'repeat': args.repeat,
+                   'results': results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        if baseline.get('environment') != environment():
+            print(f"Note: baseline was recorded on {baseline.get('environment')}")
+        regressions = compare_results(baseline['results'], results, args.threshold, args.size_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for name, metric, old, new in regressions:
+                print(f"  {name:<22}{metric:<18}{old:>14.6g} -> {new:<14.6g}({new / old - 1:+.1%})")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Compact binary model format alongside the JSON exports
+
+A .bin model file is a small JSON header followed by raw little-endian
+buffers that JavaScript can wrap as typed arrays without parsing:
+
+    bytes 0-3   magic b'MLVB'
+    bytes 4-7   uint32 header length H (a multiple of 8)
+    bytes 8..   UTF-8 JSON header, space padded to H bytes
+    then        data section; each buffer starts on a 4-byte boundary
+
+The header is the exported model dict with every numeric array of at least
+MIN_BUFFER_ELEMENTS values replaced by {"$buffer": i}. header["buffers"][i]
+gives that array's dtype ("float32", "int32", "uint8" for arrays that
+are already quantized to bytes, or "int8" for the codes of --quantize int8
+fields), shape, byteOffset (from the start of the data section) and
+byteLength. In JS:
+
+    new Float32Array(arrayBuffer, 8 + H + b.byteOffset, b.byteLength / 4)
+
+    python binary_export.py                # compare every models/*.json
+    python binary_export.py models/svm_model.json
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'MLVB'
+FORMAT_VERSION = 1
+
+DTYPES = {'float32': '<f4', 'int32': '<i4', 'uint8': 'u1', 'int8': 'i1'}
+
+# Shorter arrays (class labels, layer sizes...) stay inline in the header
+MIN_BUFFER_ELEMENTS = 16
+
+def _numeric_array(value):
+    """value as a float32/int32/uint8/int8 ndarray, or None if it isn't a numeric array"""
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        # Ragged nested lists
+        return None
+    if array.dtype == np.bool_ or array.ndim == 0:
+        return None
+    if array.dtype in (np.uint8, np.int8):
+        return array
+    if np.issubdtype(array.dtype, np.integer):
+        if array.size and (array.min() < np.iinfo(np.int32).min or array.max() > np.iinfo(np.int32).max):
+            return None
+        return array.astype('<i4')
+    if np.issubdtype(array.dtype, np.floating):
+        return array.astype('<f4')
+    return None
+
+def _extract_buffers(value, buffers):
+    """Copy of `value` with large numeric arrays moved into `buffers`"""
+    if isinstance(value, dict):
+        if value.get('$quantized') == 'int8':
+            # Codes read back from JSON are plain ints; keep them one byte each
+            value = dict(value, values=np.asarray(value['values'], dtype=np.int8))
+        return {key: _extract_buffers(item, buffers) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        array = _numeric_array(value)
+        if array is not None and array.size >= MIN_BUFFER_ELEMENTS:
+            buffers.append(array)
+            return {'$buffer': len(buffers) - 1}
+        if array is not None:
+            return array.tolist()
+        return [_extract_buffers(item, buffers) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def encode_binary_model(model_data):
+    """Encode an exported model dict (as produced by export_model_to_json)"""
+    buffers = []
+    model = _extract_buffers(model_data, buffers)
+
+    descriptors = []
+    offset = 0
+    for array in buffers:
+        descriptors.append({
+            'dtype': array.dtype.name,
+            'shape': list(array.shape),
+            'byteOffset': offset,
+            'byteLength': array.nbytes,
+        })
+        # Keep the next buffer 4-byte aligned after a one-byte one
+        offset += array.nbytes + (-array.nbytes % 4)
+
+    header = json.dumps({
+        'format': 'mlvb',
+        'version': FORMAT_VERSION,
+        'model': model,
+        'buffers': descriptors,
+    }, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-len(header) % 8)
+
+    parts = [MAGIC, struct.pack('<I', len(header)), header]
+    for array in buffers:
+        parts.append(array.tobytes())
+        parts.append(b'\0' * (-array.nbytes % 4))
+    return b''.join(parts)
+
+def write_binary_model(model_data, path):
+    """Write model_data as a .bin file and return its size in bytes"""
+    data = encode_binary_model(model_data)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def _restore_buffers(value, arrays):
+    if isinstance(value, dict):
+        if set(value) == {'$buffer'}:
+            return arrays[value['$buffer']]
+        return {key: _restore_buffers(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore_buffers(item, arrays) for item in value]
+    return value
+
+def decode_binary_model(data, as_lists=False):
+    """Decode .bin bytes back into a model dict.
+
+    Arrays come back as read-only NumPy views onto `data`; as_lists=True
+    converts them to nested lists like the JSON export.
+    """
+    if data[:4] != MAGIC:
+        raise ValueError('Not an MLVB model file')
+    (header_length,) = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_length])
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported MLVB version {header.get('version')}")
+
+    base = 8 + header_length
+    arrays = []
+    for descriptor in header['buffers']:
+        dtype = np.dtype(DTYPES[descriptor['dtype']])
+        array = np.frombuffer(data, dtype=dtype, count=descriptor['byteLength'] // dtype.itemsize,
+                              offset=base + descriptor['byteOffset']).reshape(descriptor['shape'])
+        arrays.append(array.tolist() if as_lists else array)
+    return _restore_buffers(header['model'], arrays)
+
+def load_binary_model(path, as_lists=False):
+    """Round-trip loader for files written by write_binary_model()"""
+    with open(path, 'rb') as f:
+        return decode_binary_model(f.read(), as_lists)
+
+def max_abs_difference(original, decoded):
+    """Largest absolute difference between matching numbers in two exports"""
+    if isinstance(original, dict):
+        return max((max_abs_difference(original[key], decoded[key]) for key in original), default=0.0)
+    if isinstance(original, list):
+        decoded = np.asarray(decoded).tolist() if isinstance(decoded, np.ndarray) else decoded
+        if len(original) != len(decoded):
+            raise ValueError('Length mismatch after round trip')
+        return max((max_abs_difference(a, b) for a, b in zip(original, decoded)), default=0.0)
+    if isinstance(original, (int, float)) and not isinstance(original, bool):
+        return abs(float(original) - float(decoded))
+    if original != decoded:
+        raise ValueError(f'Value mismatch after round trip: {original!r} != {decoded!r}')
+    return 0.0
+
+def _median_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+def compare(json_path, repeat=20):
+    """Size and parse time of a JSON export against its binary encoding"""
+    with open(json_path, 'rb') as f:
+        json_bytes = f.read()
+    model_data = json.loads(json_bytes)
+    bin_bytes = encode_binary_model(model_data)
+
+    return {
+        'model': os.path.basename(json_path).replace('_model.json', ''),
+        'json_bytes': len(json_bytes),
+        'bin_bytes': len(bin_bytes),
+        'json_gzip_bytes': len(gzip.compress(json_bytes, mtime=0)),
+        'bin_gzip_bytes': len(gzip.compress(bin_bytes, mtime=0)),
+        'json_parse_seconds': _median_time(lambda: json.loads(json_bytes), repeat),
+        'bin_parse_seconds': _median_time(lambda: decode_binary_model(bin_bytes), repeat),
+        'max_abs_error': max_abs_difference(model_data, decode_binary_model(bin_bytes)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare JSON model exports with the binary format')
+    default_glob = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', '*_model.json')
+    parser.add_argument('paths', nargs='*', help='JSON exports to compare (default: models/*_model.json)')
+    parser.add_argument('--repeat', type=int, default=20, help='parse runs per measurement (median)')
+    parser.add_argument('--write', action='store_true', help='also write a .bin next to each JSON file')
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(glob.glob(default_glob))
+    print(f"{'model':<22}{'json':>10}{'bin':>10}{'json.gz':>10}{'bin.gz':>10}"
+          f"{'json ms':>10}{'bin ms':>10}{'max err':>10}")
+    for path in paths:
+        r = compare(path, args.repeat)
+        print(f"{r['model']:<22}{r['json_bytes']:>10}{r['bin_bytes']:>10}{r['json_gzip_bytes']:>10}"
+              f"{r['bin_gzip_bytes']:>10}{r['json_parse_seconds'] * 1000:>10.3f}"
+              f"{r['bin_parse_seconds'] * 1000:>10.3f}{r['max_abs_error']:>10.2e}")
+        if args.write:
+            with open(path) as f:
+                write_binary_model(json.load(f), path[:-len('.json')] + '.bin')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Flattened, array-backed random forest export and batched NumPy predictor
+
+All trees of a forest are concatenated into contiguous node arrays:
+
+    feature[n], threshold[n]   split of every node (-2 / 0.0 at leaves)
+    left[n], right[n]          global child node indexes (-1 at leaves)
+    leaf_value[n][c]           class probabilities of each node
+    tree_offsets[t + 1]        first node of each tree, plus the total
+
+The point of the format is portability: inference.py and real-models.js
+predict from it without scikit-learn. predict_proba_flat() evaluates a whole
+batch across every tree at once, one tree level per NumPy step, and matches
+predict_proba up to float rounding. It is not faster than scikit-learn's compiled
+traversal, which stays ahead by roughly 1.6x on large batches.
+
+    python forest_export.py            # verify and benchmark on large batches
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# Samples evaluated per step; bounds the (samples x trees) index arrays
+BATCH_SIZE = 8192
+
+def flatten_forest(model):
+    """Flatten a fitted RandomForestClassifier into a dict of arrays"""
+    features, thresholds, lefts, rights, values = [], [], [], [], []
+    offsets = [0]
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        offset = offsets[-1]
+        leaf = tree.children_left == -1
+        features.append(tree.feature)
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(leaf, -1, tree.children_left + offset))
+        rights.append(np.where(leaf, -1, tree.children_right + offset))
+        value = tree.value[:, 0, :]
+        values.append(value / value.sum(axis=1, keepdims=True))
+        offsets.append(offset + tree.node_count)
+
+    return {
+        'n_trees': len(model.estimators_),
+        'n_classes': int(model.n_classes_),
+        'max_depth': int(max(estimator.tree_.max_depth for estimator in model.estimators_)),
+        'tree_offsets': offsets,
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'leaf_value': np.concatenate(values),
+    }
+
+def float32_below(thresholds):
+    """Largest float32 <= each float64 threshold.
+
+    scikit-learn compares float32 features with float64 thresholds; for a
+    float32 x, x <= t exactly when x <= float32_below(t), so the traversal
+    can stay in float32.
+    """
+    rounded = thresholds.astype(np.float32)
+    above = rounded.astype(np.float64) > thresholds
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+class FlatForest:
+    """NumPy arrays for a flattened forest, ready for batched prediction"""
+
+    def __init__(self, flat):
+        # Native-width indexes, so the gathers below never convert them
+        self.roots = np.asarray(flat['tree_offsets'][:-1], dtype=np.intp)
+        self.max_depth = int(flat['max_depth'])
+        left = np.asarray(flat['left'], dtype=np.intp)
+        right = np.asarray(flat['right'], dtype=np.intp)
+        leaf = left == -1
+        index = np.arange(len(left), dtype=np.intp)
+        # Leaves point at themselves, so every sample can take exactly
+        # max_depth steps without any per-sample branching. Children are
+        # interleaved so one gather picks the next node: 2*node + went_right
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2] = np.where(leaf, index, left)
+        self.children[1::2] = np.where(leaf, index, right)
+        self.feature = np.where(leaf, 0, np.asarray(flat['feature'])).astype(np.intp)
+        self.threshold = float32_below(np.asarray(flat['threshold'], dtype=np.float64))
+        self.leaf_value = np.asarray(flat['leaf_value'], dtype=np.float64)
+        # One contiguous row per class, pre-divided by the number of trees,
+        # so averaging is a gather and a row sum per class
+        self.class_values = np.ascontiguousarray(self.leaf_value.T) / len(self.roots)
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_samples, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        row_base = (np.arange(n_samples, dtype=np.intp) * n_features)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_samples, axis=0)
+        for _ in range(self.max_depth):
+            values = flat_X[row_base + self.feature[nodes]]
+            went_right = values > self.threshold[nodes]
+            nodes = self.children[2 * nodes + went_right]
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        out = np.empty((len(X), self.leaf_value.shape[1]))
+        for start in range(0, len(X), BATCH_SIZE):
+            leaves = self.apply(X[start:start + BATCH_SIZE])
+            for c, values in enumerate(self.class_values):
+                out[start:start + BATCH_SIZE, c] = values[leaves].sum(axis=1)
+        return out
+
+def predict_proba_flat(flat, X):
+    """Class probabilities for a batch of samples from a flattened forest"""
+    return FlatForest(flat).predict_proba(X)
+
+def _benchmark(sizes, n_estimators, max_depth, seed):
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = make_classification(n_samples=5000, n_features=20, n_informative=10,
+                               n_classes=3, random_state=seed)
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                   random_state=seed, n_jobs=1).fit(X, y)
+    forest = FlatForest(flatten_forest(model))
+    rng = np.random.default_rng(seed)
+
+    print(f"{n_estimators} trees, max_depth={max_depth}")
+    print(f"{'samples':>10}{'sklearn ms':>14}{'flat ms':>12}{'max |diff|':>14}")
+    for n in sizes:
+        batch = rng.normal(size=(n, X.shape[1])) * X.std(axis=0) + X.mean(axis=0)
+        start = time.perf_counter()
+        expected = model.predict_proba(batch)
+        sklearn_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = forest.predict_proba(batch)
+        flat_time = time.perf_counter() - start
+        diff = np.abs(expected - actual).max()
+        print(f"{n:>10}{sklearn_time * 1000:>14.1f}{flat_time * 1000:>12.1f}{diff:>14.2e}")
+        if diff > 1e-9:
+            raise AssertionError(f"Flat forest disagrees with predict_proba by {diff}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verify and benchmark the flattened forest predictor')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+    _benchmark(args.sizes, args.n_estimators, args.max_depth, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""
+Pure-NumPy reference inference for the exported models/*.json files
+
+load_model() turns an export back into a predictor with batched predict()
+(and predict_proba() for classifiers) that works on whole arrays at once,
+with no per-sample Python loops and no scikit-learn. Inputs are raw
+feature rows; each model applies its exported scaler itself.
+
+    python inference.py                 # check every models/*.json
+    python inference.py --batch 1000000 # ...and measure throughput
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from forest_export import FlatForest
+from knn_index import KDTreeIndex
+from quantize import dequantize
+
+# Rows per step for models that build (samples x points) distance matrices
+CHUNK_SIZE = 4096
+
+# Below this many training points a brute-force KNN scan beats the KD-tree
+KD_TREE_MIN_POINTS = 1024
+
+def _scaler(model_data):
+    """Function applying the exported StandardScaler, or identity"""
+    if 'scaler_mean' not in model_data:
+        return lambda X: X
+    mean = np.asarray(model_data['scaler_mean'], dtype=np.float64)
+    scale = np.asarray(model_data['scaler_scale'], dtype=np.float64)
+    return lambda X: (X - mean) / scale
+
+def _squared_distances(A, B, B_sq=None):
+    """Pairwise squared Euclidean distances between rows of A and rows of B"""
+    if B_sq is None:
+        B_sq = np.einsum('ij,ij->i', B, B)
+    A_sq = np.einsum('ij,ij->i', A, A)
+    return np.maximum(A_sq[:, None] - 2.0 * A @ B.T + B_sq[None, :], 0.0)
+
+def _softmax(Z):
+    Z = Z - Z.max(axis=1, keepdims=True)
+    np.exp(Z, out=Z)
+    return Z / Z.sum(axis=1, keepdims=True)
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+def _tree_depth(left, right):
+    """Depth of a tree given its children arrays (-1 = leaf)"""
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+def flatten_tree_dicts(trees):
+    """Build a forest_export-style flat dict from per-tree JSON dicts"""
+    features, thresholds, lefts, rights, values = [], [], [], [], []
+    offsets = [0]
+    max_depth = 0
+    for tree in trees:
+        offset = offsets[-1]
+        left = np.asarray(tree['children_left'])
+        right = np.asarray(tree['children_right'])
+        leaf = left == -1
+        value = np.asarray(tree['value'], dtype=np.float64)[:, 0, :]
+        features.append(np.asarray(tree['feature']))
+        thresholds.append(np.asarray(tree['threshold'], dtype=np.float64))
+        lefts.append(np.where(leaf, -1, left + offset))
+        rights.append(np.where(leaf, -1, right + offset))
+        values.append(value / value.sum(axis=1, keepdims=True))
+        offsets.append(offset + len(left))
+        max_depth = max(max_depth, _tree_depth(left, right))
+    return {
+        'max_depth': max_depth,
+        'tree_offsets': offsets,
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'leaf_value': np.concatenate(values),
+    }
+
+class ExportedModel:
+    """Base class: predictions from an export's arrays"""
+
+    is_classifier = True
+
+    def __init__(self, model_data):
+        self.model_data = model_data
+        self.scale = _scaler(model_data)
+        classes = model_data.get('classes')
+        self.classes = np.asarray(classes) if classes is not None else None
+
+    def predict_proba(self, X):
+        raise NotImplementedError(f"{self.model_data['type']} has no probabilities")
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+class LinearRegressionModel(ExportedModel):
+    is_classifier = False
+
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.coef = np.asarray(model_data['coefficients'], dtype=np.float64)
+        self.intercept = float(model_data['intercept'])
+
+    def predict(self, X):
+        return self.scale(np.asarray(X, dtype=np.float64)) @ self.coef + self.intercept
+
+class LogisticRegressionModel(ExportedModel):
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.coef = np.asarray(model_data['coefficients'], dtype=np.float64)
+        self.intercept = float(model_data['intercept'])
+
+    def decision_function(self, X):
+        return self.scale(np.asarray(X, dtype=np.float64)) @ self.coef + self.intercept
+
+    def predict_proba(self, X):
+        p = _sigmoid(self.decision_function(X))
+        return np.column_stack([1.0 - p, p])
+
+class TreeEnsembleModel(ExportedModel):
+    """Decision tree (a forest of one) and random forest"""
+
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        if 'flat_forest' in model_data:
+            flat = model_data['flat_forest']
+        elif 'trees' in model_data:
+            flat = flatten_tree_dicts(model_data['trees'])
+        else:
+            flat = flatten_tree_dicts([model_data['tree_structure']])
+        self.forest = FlatForest(flat)
+        if self.classes is None:
+            self.classes = np.arange(self.forest.leaf_value.shape[1])
+
+    def predict_proba(self, X):
+        return self.forest.predict_proba(np.asarray(X, dtype=np.float64))
+
+class KMeansModel(ExportedModel):
+    is_classifier = False
+
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.centroids = np.asarray(model_data['centroids'], dtype=np.float64)
+
+    def predict(self, X):
+        X = self.scale(np.asarray(X, dtype=np.float64))
+        return np.argmin(_squared_distances(X, self.centroids), axis=1)
+
+class KNNModel(ExportedModel):
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.points = np.asarray(model_data['training_data'], dtype=np.float64)
+        self.labels = np.asarray(model_data['training_labels'])
+        self.k = int(model_data['n_neighbors'])
+        self.points_sq = np.einsum('ij,ij->i', self.points, self.points)
+        if self.classes is None or not len(self.classes):
+            self.classes = np.unique(self.labels)
+        # Labels as indexes into classes for vote counting
+        self.label_index = np.searchsorted(self.classes, self.labels)
+        self.index = None
+        if 'kd_tree' in model_data and len(self.points) >= KD_TREE_MIN_POINTS:
+            self.index = KDTreeIndex(self.points, model_data['kd_tree'])
+
+    def kneighbors(self, X):
+        """Indexes of the k nearest training points for every row of X"""
+        X = self.scale(np.asarray(X, dtype=np.float64))
+        if self.index is not None:
+            return self.index.query(X, self.k)[1]
+        out = np.empty((len(X), self.k), dtype=np.int64)
+        for start in range(0, len(X), CHUNK_SIZE):
+            d = _squared_distances(X[start:start + CHUNK_SIZE], self.points, self.points_sq)
+            nearest = np.argpartition(d, self.k - 1, axis=1)[:, :self.k]
+            order = np.take_along_axis(d, nearest, axis=1).argsort(axis=1, kind='stable')
+            out[start:start + CHUNK_SIZE] = np.take_along_axis(nearest, order, axis=1)
+        return out
+
+    def predict_proba(self, X):
+        votes = self.label_index[self.kneighbors(X)]
+        counts = np.zeros((len(votes), len(self.classes)))
+        np.add.at(counts, (np.arange(len(votes))[:, None], votes), 1.0)
+        return counts / self.k
+
+class SVMModel(ExportedModel):
+    """Binary SVC with an RBF (or linear) kernel, or its `rff` approximation"""
+
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.intercept = np.asarray(model_data['intercept'], dtype=np.float64)
+        self.kernel = model_data.get('kernel', 'rbf')
+        self.rff = None
+        if 'rff' in model_data:
+            rff = model_data['rff']
+            self.rff = tuple(np.asarray(rff[key], dtype=np.float64) for key in ('weights', 'offsets', 'coef'))
+            return
+
+        self.support_vectors = np.asarray(model_data['support_vectors'], dtype=np.float64)
+        self.dual_coef = np.asarray(model_data['dual_coef'], dtype=np.float64)
+        if self.dual_coef.shape[0] != 1:
+            raise NotImplementedError('Only binary SVM exports are supported')
+        # gamma='scale' is 1 / (n_features * X.var()); on standardized
+        # training data X.var() is 1, so older exports without gamma use that
+        self.gamma = float(model_data.get('gamma', 1.0 / self.support_vectors.shape[1]))
+        if 'support_vector_norms' in model_data:
+            self.sv_sq = np.asarray(model_data['support_vector_norms'], dtype=np.float64)
+        else:
+            self.sv_sq = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+
+    def kernel_matrix(self, X_scaled, vectors, vectors_sq):
+        """Kernel between scaled rows and a set of vectors with known |v|^2"""
+        if self.kernel == 'linear':
+            return X_scaled @ vectors.T
+        return np.exp(-self.gamma * _squared_distances(X_scaled, vectors, vectors_sq))
+
+    def _decision_chunk(self, chunk):
+        if self.rff is not None:
+            weights, offsets, coef = self.rff
+            features = np.cos(chunk @ weights.T + offsets)
+            return np.sqrt(2.0 / len(offsets)) * (features @ coef) + self.intercept[0]
+        K = self.kernel_matrix(chunk, self.support_vectors, self.sv_sq)
+        return K @ self.dual_coef[0] + self.intercept[0]
+
+    def decision_function(self, X):
+        X = self.scale(np.asarray(X, dtype=np.float64))
+        out = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_SIZE):
+            out[start:start + CHUNK_SIZE] = self._decision_chunk(X[start:start + CHUNK_SIZE])
+        return out
+
+    def predict(self, X):
+        return self.classes[(self.decision_function(X) > 0).astype(np.int64)]
+
+class NeuralNetworkModel(ExportedModel):
+    """MLPClassifier forward pass (ReLU hidden layers, softmax/logistic output)"""
+
+    ACTIVATIONS = {
+        'relu': lambda Z: np.maximum(Z, 0.0),
+        'tanh': np.tanh,
+        'logistic': _sigmoid,
+        'identity': lambda Z: Z,
+    }
+
+    def __init__(self, model_data):
+        super().__init__(model_data)
+        self.coefs = [np.asarray(c, dtype=np.float64) for c in model_data['coefs']]
+        self.intercepts = [np.asarray(b, dtype=np.float64) for b in model_data['intercepts']]
+        self.activation = self.ACTIVATIONS[model_data.get('activation', 'relu')]
+
+    def predict_proba(self, X):
+        A = self.scale(np.asarray(X, dtype=np.float64))
+        for coef, intercept in zip(self.coefs[:-1], self.intercepts[:-1]):
+            A = self.activation(A @ coef + intercept)
+        Z = A @ self.coefs[-1] + self.intercepts[-1]
+        if Z.shape[1] == 1:
+            p = _sigmoid(Z[:, 0])
+            return np.column_stack([1.0 - p, p])
+        return _softmax(Z)
+
+MODEL_CLASSES = {
+    'linear_regression': LinearRegressionModel,
+    'logistic_regression': LogisticRegressionModel,
+    'decision_tree': TreeEnsembleModel,
+    'random_forest': TreeEnsembleModel,
+    'kmeans': KMeansModel,
+    'knn': KNNModel,
+    'svm': SVMModel,
+    'neural_network': NeuralNetworkModel,
+}
+
+def load_model(source):
+    """Predictor for an export given as a dict or a path to its JSON file"""
+    if isinstance(source, str):
+        with open(source) as f:
+            source = json.load(f)
+    return MODEL_CLASSES[source['type']](dequantize(source))
+
+def validate_export(model_data, X, expected):
+    """Agreement between an export's predictions and the trained model's.
+
+    Returns the fraction of identical predictions for classifiers and
+    clustering, or the max absolute difference for regression.
+    """
+    model = load_model(model_data)
+    predictions = model.predict(X)
+    if model_data['type'] == 'linear_regression':
+        return float(np.abs(predictions - expected).max())
+    return float(np.mean(predictions == np.asarray(expected)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the NumPy reference inference on exported models')
+    default_glob = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', '*_model.json')
+    parser.add_argument('paths', nargs='*', help='exports to check (default: models/*_model.json)')
+    parser.add_argument('--batch', type=int, default=100000,
+                        help='synthetic batch size for the throughput measurement')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{'model':<22}{'sample score':>14}{'rows/s':>14}")
+    for path in args.paths or sorted(glob.glob(default_glob)):
+        with open(path) as f:
+            model_data = dequantize(json.load(f))
+        model = load_model(model_data)
+        sample = model_data['sample_data']
+        X = np.asarray(sample['X'], dtype=np.float64)
+
+        if 'y' in sample and model.is_classifier:
+            score = f"{np.mean(model.predict(X) == np.asarray(sample['y'])):.4f} acc"
+        elif 'y' in sample:
+            y = np.asarray(sample['y'])
+            residual = ((model.predict(X) - y) ** 2).sum()
+            score = f"{1 - residual / ((y - y.mean()) ** 2).sum():.4f} R2"
+        else:
+            score = f"{np.mean(model.predict(X) == np.asarray(sample['labels'])):.4f} agree"
+
+        batch = X[rng.integers(0, len(X), args.batch)] + rng.normal(0, 0.01, (args.batch, X.shape[1]))
+        start = time.perf_counter()
+        model.predict(batch)
+        rate = args.batch / (time.perf_counter() - start)
+        print(f"{model_data['type']:<22}{score:>14}{rate:>14,.0f}")
+
+if __name__ == '__main__':
+    main()
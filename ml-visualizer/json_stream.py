@@ -0,0 +1,162 @@
+"""
+Streaming, atomic JSON writer for model exports
+
+write_json() produces the same text as json.dump(obj, f, indent=2), but
+NumPy arrays inside `obj` are converted and written a chunk of rows at a
+time instead of being turned into one big nested list first. Exports can
+therefore keep their arrays as ndarrays (or memory-mapped views), and peak
+memory stays close to the size of the model itself.
+
+The file is written to `<path>.tmp` and renamed over `path` only once it is
+complete, so readers never see a half-written export.
+
+    python json_stream.py               # compare memory with json.dump
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+# Array elements converted to Python objects per chunk
+CHUNK_ELEMENTS = 1 << 16
+
+def _scalar(value):
+    """JSON text for a scalar, matching the json module"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return float.__repr__(value)
+    if isinstance(value, str):
+        return json.dumps(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def _iter_items(items, level, indent):
+    """Elements of an (already converted) sequence, one per line"""
+    inner = '\n' + ' ' * (indent * (level + 1))
+    separator = ''
+    for item in items:
+        yield separator or inner
+        separator = ',' + inner
+        yield from _iter_json(item, level + 1, indent)
+
+def _iter_array(array, level, indent):
+    if array.ndim == 0:
+        yield _scalar(array.item())
+        return
+    if len(array) == 0:
+        yield '[]'
+        return
+    rows_per_chunk = max(1, CHUNK_ELEMENTS // max(1, array[0].size))
+    inner = '\n' + ' ' * (indent * (level + 1))
+    yield '['
+    for start in range(0, len(array), rows_per_chunk):
+        chunk = array[start:start + rows_per_chunk].tolist()
+        yield inner if start == 0 else ',' + inner
+        if array.ndim == 1:
+            yield (',' + inner).join(map(_scalar, chunk))
+        else:
+            yield (',' + inner).join(''.join(_iter_json(row, level + 1, indent)) for row in chunk)
+    yield '\n' + ' ' * (indent * level) + ']'
+
+def _iter_json(value, level, indent):
+    """JSON text of `value` at nesting `level`, as a stream of strings"""
+    if isinstance(value, np.ndarray):
+        yield from _iter_array(value, level, indent)
+    elif isinstance(value, dict):
+        if not value:
+            yield '{}'
+            return
+        inner = '\n' + ' ' * (indent * (level + 1))
+        separator = '{' + inner
+        for key, item in value.items():
+            yield separator + (json.dumps(key) if isinstance(key, str) else json.dumps(_scalar(key))) + ': '
+            separator = ',' + inner
+            yield from _iter_json(item, level + 1, indent)
+        yield '\n' + ' ' * (indent * level) + '}'
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            yield '[]'
+            return
+        yield '['
+        yield from _iter_items(value, level, indent)
+        yield '\n' + ' ' * (indent * level) + ']'
+    else:
+        yield _scalar(value)
+
+def dumps(obj, indent=2, level=0):
+    """JSON text of `obj` as write_json() would write it at nesting `level`"""
+    return ''.join(_iter_json(obj, level, indent))
+
+def write_json(obj, path, indent=2):
+    """Stream `obj` to `path` as indented JSON, replacing the file atomically"""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            f.writelines(_iter_json(obj, 0, indent))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _measure(write, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    write(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare write_json with json.dump on a KNN-sized export')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--features', type=int, default=4)
+    parser.add_argument('--output', default='stream_check.json')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(args.rows, args.features))
+    labels = rng.integers(0, 3, args.rows)
+    model_data = {'type': 'knn', 'training_data': data, 'training_labels': labels, 'n_neighbors': 5}
+    model_mb = (data.nbytes + labels.nbytes) / 1e6
+
+    def dump(path):
+        listed = dict(model_data, training_data=data.tolist(), training_labels=labels.tolist())
+        with open(path, 'w') as f:
+            json.dump(listed, f, indent=2)
+
+    reference = args.output + '.reference'
+    dump_time, dump_peak = _measure(dump, reference)
+    stream_time, stream_peak = _measure(lambda path: write_json(model_data, path), args.output)
+    with open(reference) as a, open(args.output) as b:
+        identical = a.read() == b.read()
+    os.remove(reference)
+    os.remove(args.output)
+
+    print(f"arrays: {model_mb:.1f} MB, output identical to json.dump: {identical}")
+    print(f"{'writer':<12}{'seconds':>10}{'peak MB':>10}")
+    print(f"{'json.dump':<12}{dump_time:>10.2f}{dump_peak / 1e6:>10.1f}")
+    print(f"{'write_json':<12}{stream_time:>10.2f}{stream_peak / 1e6:>10.1f}")
+    if not identical:
+        raise AssertionError('write_json output differs from json.dump')
+
+if __name__ == '__main__':
+    main()
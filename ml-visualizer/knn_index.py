@@ -0,0 +1,223 @@
+"""
+KD-tree index for the KNN export and a batched k-nearest-neighbour query
+
+build_kd_tree() permutes the training points so every tree node owns a
+contiguous range [start, end) of the permuted array, and records each
+node's bounding box. The KNN export stores the permuted points and labels
+as training_data/training_labels (so a brute-force scan still works) plus
+the tree:
+
+    leaf_size                   max points per leaf
+    start[n], end[n]            point range owned by each node
+    left[n], right[n]           child node indexes (-1 at leaves)
+    lower[n][d], upper[n][d]    bounding box of each node's points
+
+KDTreeIndex.query() answers a whole batch at once: it ranks every leaf by
+its box distance to each query and scans leaves nearest-first, one leaf per
+query per NumPy step, until no unscanned leaf can hold a closer point.
+
+    python knn_index.py                 # scaling benchmark vs brute force
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+DEFAULT_LEAF_SIZE = 32
+
+# Leaves scanned for every query before checking whether more are needed
+INITIAL_LEAVES = 4
+
+# Upper bound on floats in one (queries x leaves) or (queries x points) block
+BLOCK_ELEMENTS = 1 << 22
+
+def build_kd_tree(points, leaf_size=DEFAULT_LEAF_SIZE):
+    """KD-tree over `points`, split at the median of the widest dimension.
+
+    Returns (perm, tree) where points[perm] is the permuted point array the
+    tree's ranges refer to.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n, d = points.shape
+    perm = np.arange(n)
+    start, end, left, right, lower, upper = [], [], [], [], [], []
+
+    def new_node(lo, hi):
+        start.append(lo)
+        end.append(hi)
+        left.append(-1)
+        right.append(-1)
+        lower.append(None)
+        upper.append(None)
+        return len(start) - 1
+
+    stack = [new_node(0, n)] if n else []
+    while stack:
+        node = stack.pop()
+        lo, hi = start[node], end[node]
+        idx = perm[lo:hi]
+        pts = points[idx]
+        box_lower, box_upper = pts.min(axis=0), pts.max(axis=0)
+        lower[node], upper[node] = box_lower, box_upper
+        if hi - lo <= leaf_size:
+            continue
+        dim = int(np.argmax(box_upper - box_lower))
+        mid = (lo + hi) // 2
+        perm[lo:hi] = idx[np.argpartition(pts[:, dim], mid - lo)]
+        left[node] = new_node(lo, mid)
+        right[node] = new_node(mid, hi)
+        stack.extend((right[node], left[node]))
+
+    tree = {
+        'leaf_size': int(leaf_size),
+        'start': start,
+        'end': end,
+        'left': left,
+        'right': right,
+        'lower': np.asarray(lower).reshape(-1, d),
+        'upper': np.asarray(upper).reshape(-1, d),
+    }
+    return perm, tree
+
+def _merge_topk(best_d, best_i, cand_d, cand_i, k):
+    """Keep the k smallest distances of two (q x *) candidate sets, sorted"""
+    all_d = np.concatenate([best_d, cand_d], axis=1)
+    all_i = np.concatenate([best_i, cand_i], axis=1)
+    keep = np.argpartition(all_d, k - 1, axis=1)[:, :k]
+    all_d = np.take_along_axis(all_d, keep, axis=1)
+    all_i = np.take_along_axis(all_i, keep, axis=1)
+    order = np.argsort(all_d, axis=1, kind='stable')
+    return np.take_along_axis(all_d, order, axis=1), np.take_along_axis(all_i, order, axis=1)
+
+class KDTreeIndex:
+    """Batched k-nearest-neighbour queries over an exported KD-tree"""
+
+    def __init__(self, points, tree):
+        self.points = np.asarray(points, dtype=np.float64)
+        n, d = self.points.shape
+        start = np.asarray(tree['start'])
+        leaves = np.flatnonzero(np.asarray(tree['left']) == -1)
+        self.leaf_lower = np.asarray(tree['lower'], dtype=np.float64).reshape(-1, d)[leaves]
+        self.leaf_upper = np.asarray(tree['upper'], dtype=np.float64).reshape(-1, d)[leaves]
+
+        # Leaf members padded to a fixed width; padding points at index n
+        # sit at infinity so they never enter the top k
+        sizes = np.asarray(tree['end'])[leaves] - start[leaves]
+        width = int(sizes.max()) if len(sizes) else 1
+        offsets = np.arange(width)
+        self.leaf_members = np.where(offsets[None, :] < sizes[:, None],
+                                     start[leaves][:, None] + offsets[None, :], n)
+        self.padded = np.vstack([self.points, np.full((1, d), np.inf)])
+
+    def _box_distances(self, X):
+        """Squared distance from each query to each leaf's bounding box"""
+        out = np.zeros((len(X), len(self.leaf_lower)))
+        for j in range(X.shape[1]):
+            below = self.leaf_lower[None, :, j] - X[:, j, None]
+            above = X[:, j, None] - self.leaf_upper[None, :, j]
+            gap = np.maximum(np.maximum(below, above), 0.0)
+            out += gap * gap
+        return out
+
+    def _scan(self, X, leaf_ids, best_d, best_i, k):
+        """Check one leaf per query and fold its points into the top k"""
+        members = self.leaf_members[leaf_ids]
+        diff = self.padded[members] - X[:, None, :]
+        cand_d = np.einsum('qsd,qsd->qs', diff, diff)
+        cand_d[members == len(self.points)] = np.inf
+        return _merge_topk(best_d, best_i, cand_d, members, k)
+
+    def _query_block(self, X, k):
+        n_leaves = len(self.leaf_lower)
+        box = self._box_distances(X)
+        best_d = np.full((len(X), k), np.inf)
+        best_i = np.full((len(X), k), -1, dtype=np.int64)
+
+        first = min(INITIAL_LEAVES, n_leaves)
+        nearest = np.argpartition(box, first - 1, axis=1)[:, :first] if first < n_leaves else \
+            np.tile(np.arange(n_leaves), (len(X), 1))
+        nearest = np.take_along_axis(nearest, np.argsort(np.take_along_axis(box, nearest, axis=1), axis=1), axis=1)
+        for r in range(first):
+            best_d, best_i = self._scan(X, nearest[:, r], best_d, best_i, k)
+        if first == n_leaves:
+            return best_d, best_i
+
+        # Queries whose k-th distance still exceeds the closest unscanned box
+        bound = np.partition(box, first, axis=1)[:, first]
+        pending = np.flatnonzero(best_d[:, -1] > bound)
+        if len(pending):
+            order = np.argsort(box[pending], axis=1)
+            for r in range(first, n_leaves):
+                active = best_d[pending, -1] > box[pending, order[:, r]]
+                if not active.any():
+                    break
+                rows = pending[active]
+                d, i = self._scan(X[rows], order[active, r], best_d[rows], best_i[rows], k)
+                best_d[rows], best_i[rows] = d, i
+        return best_d, best_i
+
+    def query(self, X, k):
+        """(squared distances, indexes into the permuted points), nearest first"""
+        X = np.asarray(X, dtype=np.float64)
+        k = min(k, len(self.points))
+        block = max(1, BLOCK_ELEMENTS // max(1, len(self.leaf_lower)))
+        dist = np.empty((len(X), k))
+        index = np.empty((len(X), k), dtype=np.int64)
+        for s in range(0, len(X), block):
+            dist[s:s + block], index[s:s + block] = self._query_block(X[s:s + block], k)
+        return dist, index
+
+def brute_force_query(points, X, k):
+    """Reference k-NN by full distance matrices, in memory-bounded blocks"""
+    points = np.asarray(points, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float64)
+    points_sq = np.einsum('ij,ij->i', points, points)
+    block = max(1, BLOCK_ELEMENTS // len(points))
+    dist = np.empty((len(X), k))
+    index = np.empty((len(X), k), dtype=np.int64)
+    for s in range(0, len(X), block):
+        Q = X[s:s + block]
+        d = np.maximum(np.einsum('ij,ij->i', Q, Q)[:, None] - 2.0 * Q @ points.T + points_sq, 0.0)
+        nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+        nd = np.take_along_axis(d, nearest, axis=1)
+        order = np.argsort(nd, axis=1, kind='stable')
+        dist[s:s + block] = np.take_along_axis(nd, order, axis=1)
+        index[s:s + block] = np.take_along_axis(nearest, order, axis=1)
+    return dist, index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the KD-tree k-NN query against brute force')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[150, 10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--dims', type=int, default=4)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--leaf-size', type=int, default=DEFAULT_LEAF_SIZE)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{args.queries} queries, d={args.dims}, k={args.k}")
+    print(f"{'points':>10}{'build ms':>12}{'kd query ms':>14}{'brute ms':>12}{'speedup':>10}")
+    for n in args.sizes:
+        points = rng.normal(size=(n, args.dims))
+        X = rng.normal(size=(args.queries, args.dims))
+
+        start = time.perf_counter()
+        perm, tree = build_kd_tree(points, args.leaf_size)
+        index = KDTreeIndex(points[perm], tree)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        kd_d, _ = index.query(X, args.k)
+        kd = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bf_d, _ = brute_force_query(points, X, args.k)
+        brute = time.perf_counter() - start
+
+        if not np.allclose(kd_d, bf_d, rtol=1e-9, atol=1e-9):
+            raise AssertionError(f"KD-tree distances differ from brute force at n={n}")
+        print(f"{n:>10}{build * 1000:>12.1f}{kd * 1000:>14.1f}{brute * 1000:>12.1f}{brute / kd:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Stage-level profiling for the training pipeline
+
+Training jobs wrap each step in `with stage('fit'):` (and split, scale,
+score, export, write...). Outside a profiled job stage() does nothing. Inside
+one, every stage records:
+
+    wall_seconds        elapsed time
+    cpu_seconds         process CPU time (user + system)
+    process_max_rss_kb  resident-set high-water mark of the whole process
+                        so far, read at stage end; it never goes down, so
+                        it is not the stage's own peak (Unix only)
+    peak_traced_bytes   peak Python/NumPy allocations during the stage, the
+                        per-stage memory figure (only while tracemalloc is
+                        tracing, e.g. with --profile-detail tracemalloc)
+
+StageProfiler can also dump, per job, a cProfile stats file (open with
+`python -m pstats` or snakeviz) and the top tracemalloc allocation sites.
+write_report() saves the records as plain JSON or as a Chrome trace
+(chrome://tracing, https://ui.perfetto.dev).
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Windows has no getrusage
+    resource = None
+
+DETAILS = ('cprofile', 'tracemalloc')
+FORMATS = ('json', 'chrome')
+
+# Allocation sites listed in a tracemalloc dump
+TRACEMALLOC_TOP = 25
+
+# ru_maxrss is in bytes on macOS and kilobytes elsewhere
+RSS_UNIT_BYTES = 1 if sys.platform == 'darwin' else 1024
+
+# Profiler of the job running in this process (see StageProfiler.__enter__)
+_ACTIVE = None
+
+class StageProfiler:
+    """Per-stage wall time, CPU time and peak memory for one job"""
+
+    def __init__(self, job, details=(), output_dir='profiles'):
+        unknown = set(details) - set(DETAILS)
+        if unknown:
+            raise ValueError(f"Unknown profiling details {sorted(unknown)} (expected {DETAILS})")
+        self.job = job
+        self.details = set(details)
+        self.output_dir = output_dir
+        self.records = []
+        self._profile = None
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        start = time.time()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'job': self.job,
+                'stage': name,
+                'pid': os.getpid(),
+                'start': start,
+                'wall_seconds': time.perf_counter() - wall,
+                'cpu_seconds': time.process_time() - cpu,
+            }
+            if resource is not None:
+                max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                record['process_max_rss_kb'] = max_rss * RSS_UNIT_BYTES // 1024
+            if tracing:
+                record['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1] - traced_before
+            self.records.append(record)
+
+    def __enter__(self):
+        global _ACTIVE
+        _ACTIVE = self
+        if 'tracemalloc' in self.details and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if 'cprofile' in self.details:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _ACTIVE
+        _ACTIVE = None
+        if self.details:
+            os.makedirs(self.output_dir, exist_ok=True)
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(os.path.join(self.output_dir, f'{self.job}.prof'))
+        if self._started_tracing:
+            # Leave out the profilers' own bookkeeping
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+            tracemalloc.stop()
+            with open(os.path.join(self.output_dir, f'{self.job}.tracemalloc.txt'), 'w') as f:
+                f.write(f"Largest live allocations at the end of {self.job}\n")
+                for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                    f.write(f"{stat}\n")
+        return False
+
+def stage(name):
+    """Context manager timing `name` in the active job, or a no-op"""
+    if _ACTIVE is None:
+        return contextlib.nullcontext()
+    return _ACTIVE.stage(name)
+
+def chrome_trace(records):
+    """Records as Chrome trace events: one row per job, one slice per stage"""
+    events = []
+    rows = {}
+    for record in records:
+        key = (record['pid'], record['job'])
+        if key not in rows:
+            rows[key] = len(rows) + 1
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': record['pid'], 'tid': rows[key],
+                           'args': {'name': record['job']}})
+        args = {k: v for k, v in record.items() if k not in ('job', 'stage', 'pid', 'start')}
+        events.append({
+            'name': record['stage'],
+            'cat': record['job'],
+            'ph': 'X',
+            'ts': record['start'] * 1e6,
+            'dur': record['wall_seconds'] * 1e6,
+            'pid': record['pid'],
+            'tid': rows[key],
+            'args': args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def write_report(records, path, fmt='json'):
+    """Save stage records as plain JSON or a Chrome trace"""
+    if fmt == 'chrome':
+        report = chrome_trace(records)
+    elif fmt == 'json':
+        report = {'stages': records}
+    else:
+        raise ValueError(f"Unknown profile format {fmt!r} (expected one of {FORMATS})")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def summarize(records):
+    """Text table of the stage records, in the order they ran.
+
+    'proc rss MB' is the process high-water mark so far; 'traced MB' is the
+    stage's own peak.
+    """
+    lines = [f"{'job':<22}{'stage':<12}{'wall ms':>10}{'cpu ms':>10}{'proc rss MB':>13}{'traced MB':>11}"]
+    for record in records:
+        rss = record.get('process_max_rss_kb')
+        traced = record.get('peak_traced_bytes')
+        lines.append(f"{record['job']:<22}{record['stage']:<12}{record['wall_seconds'] * 1000:>10.1f}"
+                     f"{record['cpu_seconds'] * 1000:>10.1f}{'' if rss is None else f'{rss / 1024:.1f}':>13}"
+                     f"{'' if traced is None else f'{traced / 1e6:.2f}':>11}")
+    return '\n'.join(lines)
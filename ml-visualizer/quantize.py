@@ -0,0 +1,167 @@
+"""
+Lower-precision model exports, checked against the trained model
+
+quantize_export() shrinks the float arrays of an export (coefficients,
+thresholds, centroids, support vectors, sample_data...) in one of three modes:
+
+    digits    round to N significant digits; same schema, shorter numbers
+    float16   round to the nearest float16, written in its shortest form
+    int8      integers in [-127, 127] plus a per-array scale and offset:
+              {"$quantized": "int8", "scale": s, "offset": o, "values": [...]}
+              where value = offset + scale * q (per column for 2-D arrays)
+
+Fields are tried largest first. A field is only kept at lower precision if
+its JSON text gets shorter and the export still agrees with the trained
+model's predictions on at least `min_agreement` of the check rows (R^2
+against the model's predictions for regression). Integer arrays (tree
+children, labels, indexes) are never touched. load_model() and
+real-models.js expand int8 fields with dequantize().
+"""
+
+import numpy as np
+
+from json_stream import dumps
+
+MODES = ('digits', 'float16', 'int8')
+
+DEFAULT_DIGITS = 4
+DEFAULT_MIN_AGREEMENT = 0.99
+
+# Smaller arrays (intercepts, scaler of a 4-feature model) aren't worth it
+MIN_ELEMENTS = 16
+
+FLOAT16_MAX = float(np.finfo(np.float16).max)
+
+def round_significant(values, digits):
+    """values rounded to `digits` significant digits (shortest float repr)"""
+    return np.char.mod(f'%.{digits}g', np.asarray(values, dtype=np.float64)).astype(np.float64)
+
+def round_float16(values):
+    """values rounded to float16 precision, or None if any would overflow"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size and np.abs(values).max() > FLOAT16_MAX:
+        return None
+    return values.astype(np.float16).astype(str).astype(np.float64)
+
+def quantize_int8(values):
+    """int8 codes with the scale/offset that map them back to values.
+
+    2-D arrays (feature rows) get a scale and offset per column, since
+    features can differ in range by orders of magnitude.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    axis = 0 if values.ndim == 2 else None
+    low, high = values.min(axis=axis), values.max(axis=axis)
+    offset = (high + low) / 2.0
+    scale = np.where(high > low, (high - low) / 254.0, 1.0)
+    codes = np.clip(np.round((values - offset) / scale), -127, 127).astype(np.int8)
+    if axis is None:
+        offset, scale = float(offset), float(scale)
+    return {'$quantized': 'int8', 'scale': scale, 'offset': offset, 'values': codes}
+
+def dequantize(value):
+    """Copy of an export with every int8 field expanded back to floats"""
+    if isinstance(value, dict):
+        if value.get('$quantized') == 'int8':
+            offset = np.asarray(value['offset'], dtype=np.float64)
+            scale = np.asarray(value['scale'], dtype=np.float64)
+            return offset + scale * np.asarray(value['values'], dtype=np.float64)
+        return {key: dequantize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [dequantize(item) for item in value]
+    return value
+
+def _float_fields(value, path=()):
+    """(path, array) for every float array worth quantizing"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            # KD-tree boxes are recomputed from the points instead
+            if key != 'kd_tree':
+                yield from _float_fields(item, path + (key,))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _float_fields(item, path + (i,))
+    elif isinstance(value, np.ndarray) and value.dtype.kind == 'f' and value.size >= MIN_ELEMENTS:
+        yield path, value
+
+def _set(model_data, path, value):
+    target = model_data
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+
+def _refresh_kd_bounds(model_data, path):
+    """Recompute KD-tree boxes so they contain the (rounded) points"""
+    tree = model_data.get('kd_tree')
+    if tree is None or path != ('training_data',):
+        return
+    points = np.asarray(dequantize(model_data['training_data']), dtype=np.float64)
+    tree['lower'] = np.array([points[s:e].min(axis=0) for s, e in zip(tree['start'], tree['end'])])
+    tree['upper'] = np.array([points[s:e].max(axis=0) for s, e in zip(tree['start'], tree['end'])])
+
+def export_agreement(model_data, X, expected):
+    """Agreement between an export's predictions and the trained model's.
+
+    Random forests are checked through both their per-tree and flattened
+    arrays, since the visualizer reads one and inference.py the other.
+    """
+    # inference imports this module for dequantize()
+    from inference import load_model
+
+    views = [model_data]
+    if 'flat_forest' in model_data:
+        views.append({key: item for key, item in model_data.items() if key != 'flat_forest'})
+    expected = np.asarray(expected)
+    scores = []
+    for view in views:
+        predictions = load_model(view).predict(X)
+        if model_data['type'] == 'linear_regression':
+            residual = ((predictions - expected) ** 2).sum()
+            scores.append(1.0 - residual / max(((expected - expected.mean()) ** 2).sum(), 1e-300))
+        else:
+            scores.append(float(np.mean(predictions == expected)))
+    return min(scores)
+
+def _lower_precision(values, mode, digits):
+    if mode == 'digits':
+        return round_significant(values, digits)
+    if mode == 'float16':
+        return round_float16(values)
+    if mode == 'int8':
+        return quantize_int8(values)
+    raise ValueError(f"Unknown quantization mode {mode!r} (expected one of {MODES})")
+
+def quantize_export(model_data, mode, X, expected, min_agreement=DEFAULT_MIN_AGREEMENT,
+                    digits=DEFAULT_DIGITS):
+    """Lower the precision of model_data's float arrays in place.
+
+    X / expected are check rows and the trained model's predictions for
+    them. Returns the final agreement; a summary is stored under
+    model_data['quantization'].
+    """
+    fields = sorted(_float_fields(model_data), key=lambda field: -field[1].size)
+    kept = []
+    agreement = export_agreement(model_data, X, expected)
+    for path, values in fields:
+        reduced = _lower_precision(values, mode, digits)
+        if reduced is None or len(dumps(reduced, level=len(path))) >= len(dumps(values, level=len(path))):
+            continue
+        _set(model_data, path, reduced)
+        _refresh_kd_bounds(model_data, path)
+        candidate = export_agreement(model_data, X, expected)
+        if candidate >= min_agreement:
+            kept.append('/'.join(str(key) for key in path))
+            agreement = candidate
+        else:
+            _set(model_data, path, values)
+            _refresh_kd_bounds(model_data, path)
+
+    model_data['quantization'] = {
+        'mode': mode,
+        'digits': digits if mode == 'digits' else None,
+        'min_agreement': min_agreement,
+        'agreement': agreement,
+        'fields': kept,
+        'skipped': len(fields) - len(kept),
+    }
+    return agreement
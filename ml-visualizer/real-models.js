@@ -25,13 +25,37 @@ let realDatasets = {
     neuralNetwork: null
 };
 
+// Expand int8 fields ({"$quantized": "int8", scale, offset, values}) written
+// by train_models.py --quantize int8 back into plain numbers
+function dequantizeModel(value) {
+    if (Array.isArray(value)) {
+        return value.map(dequantizeModel);
+    }
+    if (value && typeof value === 'object') {
+        if (value.$quantized === 'int8') {
+            // 2-D arrays carry one scale/offset per column
+            const param = (p, column) => Array.isArray(p) ? p[column] : p;
+            const expand = (v, column) => Array.isArray(v)
+                ? v.map(expand)
+                : param(value.offset, column) + param(value.scale, column) * v;
+            return expand(value.values);
+        }
+        const result = {};
+        for (const key of Object.keys(value)) {
+            result[key] = dequantizeModel(value[key]);
+        }
+        return result;
+    }
+    return value;
+}
+
 // Load all models
 async function loadRealModels() {
     try {
         // Load Linear Regression
         const lrResponse = await fetch('models/linear_regression_model.json');
         if (lrResponse.ok) {
-            const lrData = await lrResponse.json();
+            const lrData = dequantizeModel(await lrResponse.json());
             realModels.linearRegression = recreateLinearRegression(lrData);
             realDatasets.linearRegression = lrData.sample_data;
         }
@@ -39,7 +63,7 @@ async function loadRealModels() {
         // Load Logistic Regression
         const logrResponse = await fetch('models/logistic_regression_model.json');
         if (logrResponse.ok) {
-            const logrData = await logrResponse.json();
+            const logrData = dequantizeModel(await logrResponse.json());
             realModels.logisticRegression = recreateLogisticRegression(logrData);
             realDatasets.logisticRegression = logrData.sample_data;
         }
@@ -47,7 +71,7 @@ async function loadRealModels() {
         // Load Decision Tree
         const dtResponse = await fetch('models/decision_tree_model.json');
         if (dtResponse.ok) {
-            const dtData = await dtResponse.json();
+            const dtData = dequantizeModel(await dtResponse.json());
             realModels.decisionTree = recreateDecisionTree(dtData);
             realDatasets.decisionTree = dtData.sample_data;
         }
@@ -55,7 +79,7 @@ async function loadRealModels() {
         // Load Random Forest
         const rfResponse = await fetch('models/random_forest_model.json');
         if (rfResponse.ok) {
-            const rfData = await rfResponse.json();
+            const rfData = dequantizeModel(await rfResponse.json());
             realModels.randomForest = recreateRandomForest(rfData);
             realDatasets.randomForest = rfData.sample_data;
         }
@@ -63,7 +87,7 @@ async function loadRealModels() {
         // Load K-Means
         const kmResponse = await fetch('models/kmeans_model.json');
         if (kmResponse.ok) {
-            const kmData = await kmResponse.json();
+            const kmData = dequantizeModel(await kmResponse.json());
             realModels.kmeans = recreateKMeans(kmData);
             realDatasets.kmeans = kmData.sample_data;
         }
@@ -71,7 +95,7 @@ async function loadRealModels() {
         // Load KNN
         const knnResponse = await fetch('models/knn_model.json');
         if (knnResponse.ok) {
-            const knnData = await knnResponse.json();
+            const knnData = dequantizeModel(await knnResponse.json());
             realModels.knn = recreateKNN(knnData);
             realDatasets.knn = knnData.sample_data;
         }
@@ -79,7 +103,7 @@ async function loadRealModels() {
         // Load SVM
         const svmResponse = await fetch('models/svm_model.json');
         if (svmResponse.ok) {
-            const svmData = await svmResponse.json();
+            const svmData = dequantizeModel(await svmResponse.json());
             realModels.svm = recreateSVM(svmData);
             realDatasets.svm = svmData.sample_data;
         }
@@ -87,7 +111,7 @@ async function loadRealModels() {
         // Load Neural Network
         const nnResponse = await fetch('models/neural_network_model.json');
         if (nnResponse.ok) {
-            const nnData = await nnResponse.json();
+            const nnData = dequantizeModel(await nnResponse.json());
             realModels.neuralNetwork = recreateNeuralNetwork(nnData);
             realDatasets.neuralNetwork = nnData.sample_data;
         }
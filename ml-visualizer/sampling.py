@@ -0,0 +1,130 @@
+"""
+Deterministic row samples for the exported sample_data
+
+sample_indices() picks up to `size` rows of a label array in one pass over
+it, a chunk at a time, so it also works on memory-mapped test sets larger
+than memory. Each row gets a key from a seeded generator and the rows with
+the smallest keys are kept (a reservoir sample). Keys are drawn in row
+order, so the result depends only on the labels, size and seed, never on
+the chunk size: identical inputs give byte-identical exports.
+
+With stratify=True every class keeps the smallest keys among its own rows,
+and the sample is split between classes in proportion to their counts.
+Reservoir does the same for data that arrives in chunks (streaming.py).
+
+    python sampling.py                  # check chunking independence on 1M rows
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+DEFAULT_SEED = 42
+
+# Labels read per chunk
+CHUNK_ROWS = 1 << 16
+
+def _smallest(keys, columns, size):
+    """The `size` entries with the smallest keys"""
+    if len(keys) <= size:
+        return keys, columns
+    keep = np.argpartition(keys, size - 1)[:size]
+    return keys[keep], tuple(column[keep] for column in columns)
+
+def allocate(counts, size):
+    """Rows per class: proportional to counts, largest remainders first"""
+    counts = np.asarray(counts, dtype=np.int64)
+    quotas = counts * size / counts.sum()
+    rows = np.minimum(np.floor(quotas).astype(np.int64), counts)
+    order = np.argsort(-(quotas - rows), kind='stable')
+    for i in order[:size - rows.sum()]:
+        rows[i] += 1
+    return rows
+
+class Reservoir:
+    """Seeded sample of up to `size` rows, fed one chunk at a time.
+
+    add() takes a chunk's labels plus any number of arrays with one entry
+    per label (row indices, feature rows...); result() returns those arrays
+    restricted to the sampled rows, in the order they were added.
+    """
+
+    def __init__(self, size, seed=DEFAULT_SEED, stratify=False):
+        self.size = size
+        self.stratify = stratify
+        self._rng = np.random.default_rng(seed)
+        self._seen = 0
+        self._groups = {}
+        self._counts = {}
+
+    def add(self, labels, *columns):
+        labels = np.asarray(labels)
+        keys = self._rng.random(len(labels))
+        # Arrival order, so result() can return rows in their original order
+        columns = (np.arange(self._seen, self._seen + len(labels)),) + columns
+        self._seen += len(labels)
+        for group in (np.unique(labels) if self.stratify else [None]):
+            mask = labels == group if self.stratify else slice(None)
+            group_keys = keys[mask]
+            group_columns = tuple(np.asarray(column)[mask] for column in columns)
+            self._counts[group] = self._counts.get(group, 0) + len(group_keys)
+            if group in self._groups:
+                kept_keys, kept_columns = self._groups[group]
+                group_keys = np.concatenate([kept_keys, group_keys])
+                group_columns = tuple(map(np.concatenate, zip(kept_columns, group_columns)))
+            self._groups[group] = _smallest(group_keys, group_columns, self.size)
+
+    def result(self):
+        groups = sorted(self._groups, key=lambda group: (group is None, group))
+        rows = allocate([self._counts[group] for group in groups], min(self.size, self._seen))
+        picked = []
+        for group, n in zip(groups, rows):
+            keys, columns = self._groups[group]
+            order = np.argsort(keys, kind='stable')[:n]
+            picked.append(tuple(column[order] for column in columns))
+        columns = tuple(map(np.concatenate, zip(*picked)))
+        order = np.argsort(columns[0], kind='stable')
+        return tuple(column[order] for column in columns[1:])
+
+def sample_indices(labels, size, seed=DEFAULT_SEED, stratify=False, chunk_rows=CHUNK_ROWS):
+    """Sorted indices of a seeded sample of up to `size` rows of labels.
+
+    size=None keeps every row. labels may be any sliceable array, including
+    a memory-mapped one; it is read once, chunk_rows at a time.
+    """
+    n_rows = len(labels)
+    if size is None or size >= n_rows:
+        return np.arange(n_rows)
+    reservoir = Reservoir(size, seed, stratify)
+    for start in range(0, n_rows, chunk_rows):
+        chunk = labels[start:start + chunk_rows]
+        reservoir.add(chunk, np.arange(start, start + len(chunk)))
+    return reservoir.result()[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that sample_indices ignores chunking')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--classes', type=int, default=5)
+    parser.add_argument('--size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    labels = np.random.default_rng(0).zipf(2.0, args.rows) % args.classes
+    results = []
+    for chunk_rows in (1000, CHUNK_ROWS, args.rows):
+        start = time.perf_counter()
+        indices = sample_indices(labels, args.size, stratify=True, chunk_rows=chunk_rows)
+        elapsed = time.perf_counter() - start
+        results.append(indices)
+        print(f"chunk {chunk_rows:>9}: {elapsed * 1000:8.1f} ms")
+    identical = all(np.array_equal(results[0], other) for other in results[1:])
+    share = np.bincount(labels, minlength=args.classes) / args.rows
+    sampled = np.bincount(labels[results[0]], minlength=args.classes) / len(results[0])
+    print(f"identical across chunk sizes: {identical}")
+    print(f"class share, all rows: {np.round(share, 3)}")
+    print(f"class share, sample:   {np.round(sampled, 3)}")
+    if not identical:
+        raise AssertionError('sample depends on the chunk size')
+
+if __name__ == '__main__':
+    main()
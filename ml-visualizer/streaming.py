@@ -0,0 +1,249 @@
+"""
+Out-of-core training for datasets larger than memory
+
+train_streaming() trains a model from a CSV file (with a header row) or a
+memory-mapped .npy array a chunk of rows at a time, using the partial_fit
+estimator named in its ModelSpec (train_models.py):
+
+    linear_regression     SGDRegressor
+    logistic_regression   SGDClassifier (log loss)
+    kmeans                MiniBatchKMeans
+    neural_network        MLPClassifier
+
+The first pass fits the StandardScaler with partial_fit and collects the
+class labels. Each following pass is one epoch of partial_fit on the scaled
+chunks, rows shuffled within each chunk. Every HOLDOUT_EVERY-th row is
+held out; a last pass scores the model on those rows and draws sample_data
+from them (K-Means uses every row). Only one chunk is in memory at a time,
+plus the sample. The export goes through export_model_to_json, so the
+frontend reads it like any other model. Exports go to streamed/ unless
+--output-dir says otherwise, so a run never replaces the committed files
+in models/; an export that does not reproduce the fitted model is not
+written at all.
+
+    python streaming.py data.csv --model logistic_regression --target label
+    python streaming.py big.npy --model kmeans --chunk-rows 200000
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+
+import numpy as np
+
+from profiling import stage
+from sampling import Reservoir
+from train_models import (
+    DEFAULT_SAMPLE_SIZE, MODEL_SPECS,
+    build_estimator, export_model_to_json, output_path_for,
+)
+
+STREAMING_MODELS = tuple(name for name, spec in MODEL_SPECS.items() if spec.streaming)
+STREAMED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamed')
+
+DEFAULT_CHUNK_ROWS = 100000
+DEFAULT_EPOCHS = 5
+
+# Every HOLDOUT_EVERY-th row is kept out of training for scoring
+HOLDOUT_EVERY = 5
+
+def table_columns(path):
+    """Column names of a CSV header, or x0, x1... for a .npy array"""
+    if path.endswith('.npy'):
+        return [f'x{i}' for i in range(np.load(path, mmap_mode='r').shape[1])]
+    with open(path, newline='') as f:
+        return next(csv.reader(f))
+
+def iter_table(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Float chunks of up to chunk_rows rows of a CSV file or .npy array"""
+    if path.endswith('.npy'):
+        table = np.load(path, mmap_mode='r')
+        for start in range(0, len(table), chunk_rows):
+            yield np.asarray(table[start:start + chunk_rows], dtype=np.float64)
+        return
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                return
+            yield np.array(rows, dtype=np.float64)
+
+def _target_index(columns, target):
+    if target in columns:
+        return columns.index(target)
+    try:
+        return int(target) % len(columns)
+    except ValueError:
+        raise ValueError(f"No column {target!r} in {columns}")
+
+def _iter_rows(path, chunk_rows, target_index, classifier):
+    """(row offset, X, y) per chunk; y is None without a target column"""
+    offset = 0
+    for chunk in iter_table(path, chunk_rows):
+        if target_index is None:
+            X, y = chunk, None
+        else:
+            X, y = np.delete(chunk, target_index, axis=1), chunk[:, target_index]
+            if classifier:
+                y = y.astype(np.int64)
+        yield offset, X, y
+        offset += len(chunk)
+
+def _holdout(offset, n_rows):
+    return (np.arange(offset, offset + n_rows) % HOLDOUT_EVERY) == HOLDOUT_EVERY - 1
+
+def _training_rows(offset, n_rows, supervised):
+    """Mask of a chunk's training rows (all of them for unsupervised models)"""
+    if supervised:
+        return ~_holdout(offset, n_rows)
+    return np.ones(n_rows, dtype=bool)
+
+def train_streaming(name, path, target=None, chunk_rows=DEFAULT_CHUNK_ROWS, epochs=DEFAULT_EPOCHS,
+                    sample_size=None, seed=42):
+    """Train MODEL_SPECS[name]'s partial_fit estimator on the table at `path`.
+
+    target names (or indexes) the label column; supervised models default to
+    the last column, K-Means to none. Returns (model_data, summary line,
+    (X, predictions of the fitted model on X)) like train_model().
+    """
+    spec = MODEL_SPECS[name]
+    if not spec.streaming:
+        raise ValueError(f"{name} has no partial_fit estimator (streaming models: {', '.join(STREAMING_MODELS)})")
+    from sklearn.base import is_classifier
+    from sklearn.preprocessing import StandardScaler
+
+    model = build_estimator(name, streaming=True)
+    classifier = is_classifier(model)
+    columns = table_columns(path)
+    target_index = None
+    if target is not None or spec.supervised:
+        target_index = _target_index(columns, -1 if target is None else target)
+    feature_names = [column for i, column in enumerate(columns) if i != target_index]
+    rows = lambda: _iter_rows(path, chunk_rows, target_index, classifier)
+
+    with stage('scale'):
+        scaler = StandardScaler()
+        classes = set()
+        n_rows = 0
+        for offset, X, y in rows():
+            scaler.partial_fit(X[_training_rows(offset, len(X), spec.supervised)])
+            if classifier:
+                classes.update(np.unique(y).tolist())
+            n_rows += len(X)
+        classes = np.array(sorted(classes))
+    # The logistic regression export keeps a single coefficient row
+    if name == 'logistic_regression' and len(classes) != 2:
+        raise ValueError(f"logistic_regression needs a binary target, found {len(classes)} classes")
+
+    rng = np.random.default_rng(seed)
+    with stage('fit'):
+        for _ in range(epochs):
+            for offset, X, y in rows():
+                order = rng.permutation(np.flatnonzero(_training_rows(offset, len(X), spec.supervised)))
+                X_train = scaler.transform(X[order])
+                if not spec.supervised:
+                    model.partial_fit(X_train)
+                elif classifier:
+                    model.partial_fit(X_train, y[order], classes=classes)
+                else:
+                    model.partial_fit(X_train, y[order])
+
+    size = sample_size or spec.sample_size or DEFAULT_SAMPLE_SIZE
+    with stage('score'):
+        reservoir = Reservoir(size, seed, stratify=classifier or not spec.supervised)
+        # Running sums for accuracy, R^2 or inertia over the scored rows
+        scored = correct = inertia = 0
+        sum_y = sum_y2 = squared_error = 0.0
+        for offset, X, y in rows():
+            if spec.supervised:
+                held = _holdout(offset, len(X))
+                X, y = X[held], y[held]
+            if not len(X):
+                continue
+            X_scaled = scaler.transform(X)
+            predictions = model.predict(X_scaled)
+            scored += len(X)
+            if not spec.supervised:
+                inertia += float(((X_scaled - model.cluster_centers_[predictions]) ** 2).sum())
+                reservoir.add(predictions, X, predictions)
+            elif classifier:
+                correct += int((predictions == y).sum())
+                reservoir.add(y, X, y)
+            else:
+                sum_y += float(y.sum())
+                sum_y2 += float((y ** 2).sum())
+                squared_error += float(((predictions - y) ** 2).sum())
+                reservoir.add(y, X, y)
+        if not spec.supervised:
+            score = inertia
+        elif classifier:
+            score = correct / max(scored, 1)
+        else:
+            score = 1.0 - squared_error / max(sum_y2 - sum_y ** 2 / max(scored, 1), 1e-300)
+        X_sample, y_sample = reservoir.result()
+        check = (X_sample, model.predict(scaler.transform(X_sample)))
+
+    with stage('export'):
+        dataset_name = os.path.splitext(os.path.basename(path))[0]
+        model_data = export_model_to_json(model, name, dataset_name, scaler, feature_names)
+        model_data['dataset_source'] = 'file'
+        if spec.supervised:
+            model_data['sample_data'] = {'X': X_sample, 'y': y_sample, 'feature_names': feature_names}
+        else:
+            model_data['sample_data'] = {'X': X_sample, 'labels': y_sample, 'feature_names': feature_names}
+        if spec.target_names and classifier:
+            model_data['target_names'] = [str(label) for label in classes.tolist()]
+            model_data['sample_data']['target_names'] = model_data['target_names']
+        model_data['streaming'] = {
+            'estimator': spec.streaming[0],
+            'rows': n_rows,
+            'scored_rows': scored,
+            'chunk_rows': chunk_rows,
+            'epochs': epochs,
+        }
+
+    return model_data, f"{spec.title} (streaming) - {spec.metric}: {score:.4f}", check
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train a model out of core from a CSV or .npy table')
+    parser.add_argument('path', help='CSV file with a header row, or a 2-D .npy array')
+    parser.add_argument('--model', required=True, choices=STREAMING_MODELS)
+    parser.add_argument('--target',
+                        help='label column name or index (default: last column; none for kmeans)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f'rows read per chunk (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS,
+                        help=f'partial_fit passes over the data (default: {DEFAULT_EPOCHS})')
+    parser.add_argument('--sample-size', type=int, default=None,
+                        help=f'rows of sample_data (default: {DEFAULT_SAMPLE_SIZE})')
+    parser.add_argument('--output-dir', default=STREAMED_DIR,
+                        help='directory for the exported JSON file (default: streamed/)')
+    args = parser.parse_args(argv)
+
+    from inference import validate_export
+    from json_stream import write_json
+
+    start = time.perf_counter()
+    model_data, summary, (X_check, expected) = train_streaming(
+        args.model, args.path, args.target, args.chunk_rows, args.epochs, args.sample_size)
+    agreement = validate_export(model_data, X_check, expected)
+    if model_data['type'] == 'linear_regression':
+        summary += f" [export max error {agreement:.2e}]"
+        failed = agreement > 1e-6
+    else:
+        summary += f" [export agreement {agreement:.1%}]"
+        failed = agreement < 1.0
+    if failed:
+        raise SystemExit(f"{summary}: the export does not reproduce the fitted model, nothing written")
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = output_path_for(args.model, args.output_dir)
+    write_json(model_data, path)
+    print(f"{summary} ({time.perf_counter() - start:.2f}s)")
+    print(f"{model_data['streaming']['rows']} rows -> {path}")
+
+if __name__ == '__main__':
+    main()
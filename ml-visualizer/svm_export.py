@@ -0,0 +1,186 @@
+"""
+Compressed RBF SVM exports and their latency/accuracy trade-off
+
+Every SVM export carries `gamma` and `support_vector_norms` (|sv|^2), so an
+RBF decision function only needs one matrix product per batch:
+
+    f(x) = sum_i dual_coef[i] * exp(-gamma * (|x|^2 - 2 x.sv_i + |sv_i|^2)) + b
+
+approximate_export() can shrink a binary RBF export further, keeping the
+smallest approximation whose predictions agree with the full model on at
+least (1 - budget) of held-out rows it was not fitted on:
+
+    reduced   keep the support vectors with the largest |dual_coef| and
+              refit their coefficients by least squares; same schema as a
+              full export, just fewer support vectors
+    rff       random Fourier features: f(x) ~ sqrt(2/D) cos(x W^T + offsets)
+              . coef + b, stored as an `rff` block instead of support vectors
+
+    python svm_export.py                # benchmark both against SVC
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from inference import SVMModel
+
+APPROXIMATIONS = ('reduced', 'rff')
+
+# Default fraction of reference predictions allowed to flip
+DEFAULT_BUDGET = 0.01
+
+RFF_COMPONENTS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+def _full_model_fields(model_data):
+    """Copy of model_data without the support-vector arrays.
+
+    `quantization` goes too: it describes the full export's fields, not the
+    approximation's.
+    """
+    drop = {'support_vectors', 'support_vector_norms', 'dual_coef', 'support', 'rff', 'approximation',
+            'quantization'}
+    return {key: value for key, value in model_data.items() if key not in drop}
+
+def reduced_set(model_data, X_scaled, n_vectors, decision):
+    """Export keeping n_vectors support vectors, refit to match `decision`"""
+    model = SVMModel(model_data)
+    order = np.argsort(-np.abs(model.dual_coef[0]), kind='stable')[:n_vectors]
+    centers = model.support_vectors[np.sort(order)]
+    centers_sq = np.einsum('ij,ij->i', centers, centers)
+
+    # Least squares for new coefficients and intercept, lightly regularized
+    K = model.kernel_matrix(X_scaled, centers, centers_sq)
+    A = np.column_stack([K, np.ones(len(K))])
+    ridge = 1e-8 * np.trace(A.T @ A) / A.shape[1]
+    solution = np.linalg.solve(A.T @ A + ridge * np.eye(A.shape[1]), A.T @ decision)
+
+    reduced = _full_model_fields(model_data)
+    reduced['support_vectors'] = centers.tolist()
+    reduced['support_vector_norms'] = centers_sq.tolist()
+    reduced['dual_coef'] = [solution[:-1].tolist()]
+    reduced['intercept'] = [float(solution[-1])]
+    return reduced
+
+def random_fourier_features(model_data, n_components, seed=0):
+    """Export replacing the RBF kernel by n_components random Fourier features"""
+    model = SVMModel(model_data)
+    rng = np.random.default_rng(seed)
+    n_features = model.support_vectors.shape[1]
+    weights = rng.normal(scale=np.sqrt(2.0 * model.gamma), size=(n_components, n_features))
+    offsets = rng.uniform(0.0, 2.0 * np.pi, size=n_components)
+    features = np.sqrt(2.0 / n_components) * np.cos(model.support_vectors @ weights.T + offsets)
+
+    approx = _full_model_fields(model_data)
+    approx['rff'] = {
+        'weights': weights.tolist(),
+        'offsets': offsets.tolist(),
+        'coef': (features.T @ model.dual_coef[0]).tolist(),
+    }
+    return approx
+
+def stored_values(model_data):
+    """Numbers an SVM export stores for its decision function"""
+    if 'rff' in model_data:
+        return sum(np.size(model_data['rff'][key]) for key in ('weights', 'offsets', 'coef'))
+    return np.size(model_data['support_vectors']) + 2 * len(model_data['support_vectors'])
+
+def _candidates(model_data, method, X_scaled, decision, seed):
+    """(size, export) pairs for a method, smallest first"""
+    if method == 'reduced':
+        n_support = len(model_data['support_vectors'])
+        size = 1
+        while size < n_support:
+            yield size, reduced_set(model_data, X_scaled, size, decision)
+            size *= 2
+    elif method == 'rff':
+        for size in RFF_COMPONENTS:
+            yield size, random_fourier_features(model_data, size, seed)
+    else:
+        raise ValueError(f"Unknown SVM approximation {method!r} (expected one of {APPROXIMATIONS})")
+
+def approximate_export(model_data, X_train, X_test, method, budget=DEFAULT_BUDGET, seed=0):
+    """Smallest `method` approximation agreeing with the export on >= 1 - budget of X_test.
+
+    Both hold raw (unscaled) rows: the reduced set is fitted on X_train and
+    agreement is measured on the held-out X_test. Returns (export,
+    agreement); the export is model_data itself when no approximation
+    smaller than it fits the budget.
+    """
+    if model_data.get('kernel', 'rbf') != 'rbf':
+        raise ValueError('Only RBF SVM exports can be approximated')
+    full = SVMModel(model_data)
+    X_train = np.asarray(X_train, dtype=np.float64)
+    X_test = np.asarray(X_test, dtype=np.float64)
+    expected = full.decision_function(X_test) > 0
+    X_scaled = full.scale(X_train)
+
+    for size, candidate in _candidates(model_data, method, X_scaled, full.decision_function(X_train), seed):
+        if stored_values(candidate) >= stored_values(model_data):
+            break
+        agreement = float(np.mean((SVMModel(candidate).decision_function(X_test) > 0) == expected))
+        if agreement >= 1.0 - budget:
+            candidate['approximation'] = {
+                'method': method,
+                'size': size,
+                'budget': budget,
+                'agreement': agreement,
+                'n_support_full': len(model_data['support_vectors']),
+            }
+            return candidate, agreement
+    return model_data, 1.0
+
+def _benchmark(batch, seed):
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    from datasets import load_dataset
+    from train_models import export_model_to_json
+
+    dataset = load_dataset('breast_cancer')
+    X_train, X_test, y_train, _ = train_test_split(dataset.data, dataset.target, test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    svc = SVC(kernel='rbf', random_state=42).fit(scaler.transform(X_train), y_train)
+    model_data = export_model_to_json(svc, 'svm', 'breast_cancer', scaler)
+
+    rng = np.random.default_rng(seed)
+    X_all = np.asarray(dataset.data)
+    X_batch = X_all[rng.integers(0, len(X_all), batch)] * rng.normal(1.0, 0.05, (batch, X_all.shape[1]))
+
+    start = time.perf_counter()
+    reference = svc.decision_function(scaler.transform(X_batch))
+    svc_time = time.perf_counter() - start
+    X_train_scaled = scaler.transform(X_train)
+
+    print(f"{len(model_data['support_vectors'])} support vectors, batch of {batch}")
+    print(f"{'variant':<16}{'size':>8}{'ms':>10}{'max |diff|':>14}{'agree':>10}{'test agree':>12}")
+    print(f"{'SVC':<16}{'':>8}{svc_time * 1000:>10.1f}{0.0:>14.2e}{1.0:>10.2%}{1.0:>12.2%}")
+    variants = [('numpy full', len(model_data['support_vectors']), model_data)]
+    for size in (8, 16, 32, 64):
+        variants.append(('reduced', size, reduced_set(model_data, X_train_scaled, size,
+                                                       svc.decision_function(X_train_scaled))))
+    for size in (64, 256, 1024):
+        variants.append(('rff', size, random_fourier_features(model_data, size, seed)))
+
+    test_expected = svc.decision_function(scaler.transform(X_test)) > 0
+    for label, size, variant in variants:
+        model = SVMModel(variant)
+        start = time.perf_counter()
+        decision = model.decision_function(X_batch)
+        elapsed = time.perf_counter() - start
+        agree = np.mean((decision > 0) == (reference > 0))
+        test_agree = np.mean((model.decision_function(X_test) > 0) == test_expected)
+        print(f"{label:<16}{size:>8}{elapsed * 1000:>10.1f}{np.abs(decision - reference).max():>14.2e}"
+              f"{agree:>10.2%}{test_agree:>12.2%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare SVM export approximations with SVC.decision_function')
+    parser.add_argument('--batch', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    _benchmark(args.batch, args.seed)
+
+if __name__ == '__main__':
+    main()
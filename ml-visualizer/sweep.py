@@ -0,0 +1,297 @@
+"""
+Hyperparameter sweeps for the visualized models
+
+Every ModelSpec with a `grid` (train_models.py) can be searched here. The
+candidates are the spec's params with each grid combination applied, scored
+by k-fold cross-validation on the training split (stratified for
+classifiers) with the spec's own scaling and metric. Two methods:
+
+    grid      every candidate on every fold, on the full fold
+    halving   successive halving: every candidate starts on a small subset
+              of each training fold; after each round only the best 1/factor
+              go on, with factor times the rows, until the full folds. Weak
+              candidates stop early and never pay for full-size fits.
+
+Fold fits run in a process pool across all cores. Each fold score is cached
+in .sweep_cache/ under a hash of the dataset, estimator, candidate params,
+fold and row count. The row counts come from a fixed ladder
+(rows / factor^k), so extending a grid, or running grid after halving, only
+fits the folds it has not seen. The best candidate is refit on the whole
+training split and exported as usual, with the search results under
+model_data['search'], into sweeps/ rather than models/. train_models.py
+restores cached exports into models/ without knowing about the sweep, so a
+sweep written there could be silently replaced by the default params.
+
+    python sweep.py --only knn decision_tree
+    python sweep.py --method grid --folds 10
+    python sweep.py --only knn --grid knn.n_neighbors=1,3,5,7,9,11,13
+    cp sweeps/knn_model.json models/     # publish a sweep to the visualizer
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from train_models import (
+    MODEL_SPECS,
+    build_estimator, load_datasets, output_path_for, split_dataset, train_model,
+)
+from training_cache import cache_key, code_fingerprint, dataset_fingerprint
+
+METHODS = ('halving', 'grid')
+DEFAULT_FOLDS = 5
+DEFAULT_FACTOR = 3
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sweep_cache')
+SWEEPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sweeps')
+
+# Smallest training subset a halving round fits on
+MIN_SAMPLES = 20
+
+SWEEP_MODELS = tuple(name for name, spec in MODEL_SPECS.items() if spec.grid)
+
+# Datasets available to fold fits in this process (set by _init_worker)
+_DATASETS = {}
+# Their (X_train, y_train), split once per process on first use
+_TRAIN_SPLITS = {}
+
+def _init_worker(dataset_names, cache_dir):
+    global _DATASETS, _TRAIN_SPLITS
+    _DATASETS = load_datasets(dataset_names, cache_dir)
+    _TRAIN_SPLITS = {}
+
+def _train_split(dataset_name):
+    if dataset_name not in _TRAIN_SPLITS:
+        X_train, _, y_train, _ = split_dataset(_DATASETS[dataset_name])
+        _TRAIN_SPLITS[dataset_name] = (X_train, y_train)
+    return _TRAIN_SPLITS[dataset_name]
+
+class FoldCache:
+    """Fold scores from earlier sweeps, kept in one JSON file"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.path = os.path.join(cache_dir, 'folds.json')
+        self.scores = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.scores = json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.scores, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def candidates(grid):
+    """Every combination of a {param: values} grid, in grid order"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def _folds(name, dataset, n_folds):
+    """(X_train, y_train, [(train indices, validation indices)]) for a model"""
+    from sklearn.base import is_classifier
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    X_train, _, y_train, _ = split_dataset(dataset)
+    splitter = StratifiedKFold if is_classifier(build_estimator(name)) else KFold
+    folds = list(splitter(n_folds, shuffle=True, random_state=42).split(X_train, y_train))
+    return X_train, y_train, folds
+
+def fold_rows(train_indices, fold, n_samples):
+    """First n_samples of a seeded shuffle of a fold's training rows.
+
+    The shuffle does not depend on n_samples, so smaller subsets are nested
+    in larger ones.
+    """
+    order = np.random.default_rng(fold).permutation(len(train_indices))
+    return np.sort(train_indices[order[:n_samples]])
+
+def fit_fold(name, params, train_indices, valid_indices, fold, n_samples):
+    """Validation score of one candidate on one fold, fit on n_samples rows.
+
+    The indices (from _folds(), computed once per search) select rows of the
+    model's training split.
+    """
+    X, y = _train_split(MODEL_SPECS[name].dataset)
+    rows = fold_rows(train_indices, fold, n_samples)
+    X_fit, X_valid = X[rows], X[valid_indices]
+    if MODEL_SPECS[name].scale:
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler().fit(X_fit)
+        X_fit, X_valid = scaler.transform(X_fit), scaler.transform(X_valid)
+    start = time.perf_counter()
+    model = build_estimator(name, overrides=params).fit(X_fit, y[rows])
+    return float(model.score(X_valid, y[valid_indices])), time.perf_counter() - start
+
+def fold_key(name, dataset_hash, params, n_folds, fold, n_samples):
+    """Cache key of one fold fit"""
+    from importlib.metadata import version
+
+    spec = MODEL_SPECS[name]
+    inputs = {
+        'model': name,
+        'estimator': spec.estimator,
+        'params': dict(spec.params, **params),
+        'scale': spec.scale,
+        'folds': n_folds,
+        'fold': fold,
+        'rows': n_samples,
+    }
+    code_hash = code_fingerprint(_folds, _train_split, fold_rows, fit_fold, split_dataset)
+    return cache_key(dataset_hash, inputs, version('scikit-learn'), code_hash)
+
+def halving_rounds(n_candidates, max_samples, factor):
+    """Training rows per fold for each successive-halving round"""
+    n_rounds = 1 + math.ceil(math.log(max(n_candidates, 1), factor))
+    sizes = [max_samples // factor ** k for k in reversed(range(n_rounds))]
+    return [size for size in sizes if size >= MIN_SAMPLES] or [max_samples]
+
+def search(name, dataset, dataset_hash, pool, cache, method='halving', n_folds=DEFAULT_FOLDS,
+           factor=DEFAULT_FACTOR, grid=None):
+    """Cross-validated search over a model's grid.
+
+    Fold fits missing from `cache` are submitted to `pool`. Returns the
+    search summary stored in the export as model_data['search'].
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown search method {method!r} (expected one of {METHODS})")
+    grid = grid or MODEL_SPECS[name].grid
+    pending = candidates(grid)
+    _, _, folds = _folds(name, dataset, n_folds)
+    max_samples = min(len(train) for train, _ in folds)
+    sizes = halving_rounds(len(pending), max_samples, factor) if method == 'halving' else [max_samples]
+
+    results = []
+    computed = reused = 0
+    for round_number, n_samples in enumerate(sizes):
+        tasks = {}
+        for index, params in enumerate(pending):
+            for fold in range(n_folds):
+                key = fold_key(name, dataset_hash, params, n_folds, fold, n_samples)
+                if key not in cache.scores:
+                    tasks[key] = pool.submit(fit_fold, name, params, *folds[fold], fold, n_samples)
+        for key, future in tasks.items():
+            score, seconds = future.result()
+            cache.scores[key] = {'score': score, 'seconds': seconds}
+        computed += len(tasks)
+        reused += len(pending) * n_folds - len(tasks)
+
+        scored = []
+        for params in pending:
+            fold_scores = [cache.scores[fold_key(name, dataset_hash, params, n_folds, fold, n_samples)]['score']
+                           for fold in range(n_folds)]
+            scored.append((float(np.mean(fold_scores)), float(np.std(fold_scores)), params))
+            results.append({
+                'params': params,
+                'round': round_number,
+                'rows': n_samples,
+                'mean_score': scored[-1][0],
+                'std_score': scored[-1][1],
+            })
+        # Stable sort: ties keep grid order
+        scored.sort(key=lambda item: -item[0])
+        if round_number < len(sizes) - 1:
+            pending = [params for _, _, params in scored[:max(1, math.ceil(len(scored) / factor))]]
+
+    best_score, best_std, best_params = scored[0]
+    return {
+        'method': method,
+        'folds': n_folds,
+        'factor': factor if method == 'halving' else None,
+        'grid': grid,
+        'best_params': best_params,
+        'best_score': best_score,
+        'best_std': best_std,
+        'fold_fits': computed,
+        'cached_fold_fits': reused,
+        'candidates': results,
+    }
+
+def _grid_override(value):
+    """--grid value: MODEL.PARAM=v1,v2,... (values are Python literals)"""
+    target, _, values = value.partition('=')
+    name, _, param = target.partition('.')
+    if name not in SWEEP_MODELS or not param or not values:
+        raise argparse.ArgumentTypeError(f"expected MODEL.PARAM=v1,v2 for one of {', '.join(SWEEP_MODELS)}")
+    parsed = []
+    for item in values.split(','):
+        try:
+            parsed.append(ast.literal_eval(item))
+        except (ValueError, SyntaxError):
+            parsed.append(item)
+    return name, param, parsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cross-validated hyperparameter sweep; exports the best model')
+    parser.add_argument('--only', nargs='+', choices=SWEEP_MODELS, metavar='MODEL',
+                        help=f"sweep only these models ({', '.join(SWEEP_MODELS)})")
+    parser.add_argument('--method', choices=METHODS, default='halving',
+                        help='successive halving or a full grid (default: halving)')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS,
+                        help=f'cross-validation folds (default: {DEFAULT_FOLDS})')
+    parser.add_argument('--factor', type=int, default=DEFAULT_FACTOR,
+                        help=f'halving: keep 1/factor of the candidates per round (default: {DEFAULT_FACTOR})')
+    parser.add_argument('--grid', type=_grid_override, action='append', default=[],
+                        metavar='MODEL.PARAM=V1,V2',
+                        help="replace one parameter's values in a model's grid (repeatable)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--output-dir', default=SWEEPS_DIR,
+                        help='directory for the exported JSON files (default: sweeps/)')
+    parser.add_argument('--dataset-dir', default=None,
+                        help='offline dataset cache (default: .dataset_cache/)')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='if California Housing cannot be downloaded, seed a synthetic stand-in')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='fold score cache (default: .sweep_cache/)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='refit every fold, ignoring and not updating the cache')
+    args = parser.parse_args(argv)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from inference import validate_export
+    from json_stream import write_json
+
+    names = args.only or list(SWEEP_MODELS)
+    grids = {name: dict(MODEL_SPECS[name].grid) for name in names}
+    for name, param, values in args.grid:
+        if name in grids:
+            grids[name][param] = values
+
+    dataset_names = sorted({MODEL_SPECS[name].dataset for name in names})
+    datasets = load_datasets(dataset_names, args.dataset_dir, args.synthetic)
+    _init_worker(dataset_names, args.dataset_dir)
+    cache = FoldCache(args.cache_dir)
+    if args.no_cache:
+        cache.scores = {}
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(dataset_names, args.dataset_dir)) as pool:
+        for name in names:
+            start = time.perf_counter()
+            dataset = datasets[MODEL_SPECS[name].dataset]
+            result = search(name, dataset, dataset_fingerprint(dataset), pool, cache,
+                            args.method, args.folds, args.factor, grids[name])
+            if not args.no_cache:
+                cache.save()
+
+            model_data, summary, (X_check, expected) = train_model(
+                name, dataset, build_estimator(name, overrides=result['best_params']))
+            agreement = validate_export(model_data, X_check, expected)
+            model_data['search'] = result
+            write_json(model_data, output_path_for(name, args.output_dir))
+            print(f"{name}: best {result['best_params']} cv {result['best_score']:.4f} "
+                  f"± {result['best_std']:.4f} ({result['fold_fits']} fold fits, "
+                  f"{result['cached_fold_fits']} cached, {time.perf_counter() - start:.2f}s)")
+            print(f"  {summary} [export agreement {agreement:.1%}]")
+
+if __name__ == '__main__':
+    main()
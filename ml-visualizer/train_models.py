@@ -1,64 +1,85 @@
 """
 Train real ML models on public datasets and export them for visualization
+
+Every model is one declarative ModelSpec in MODEL_SPECS: dataset, estimator
+class and hyperparameters, and how it is scaled and scored. train_model()
+runs any spec. Jobs run in a process pool. Datasets come from the offline
+cache in datasets.py: the parent seeds them once and each worker
+memory-maps the cached arrays when it starts.
+
+NumPy, scikit-learn and the export helpers are imported only when a job
+needs them, so importing this module (e.g. to read MODEL_SPECS) is cheap and
+a job only loads its own estimator's sklearn module.
+
+    python train_models.py                      # train everything
+    python train_models.py --only svm random_forest
+    python train_models.py --workers 1          # run in-process, one by one
 """
 
+import argparse
+import contextlib
+import importlib
 import json
-import numpy as np
-import pandas as pd
-from sklearn.datasets import (
-    load_iris, load_breast_cancer, load_wine, 
-    fetch_california_housing
+import os
+import sys
+import time
+from collections import namedtuple
+
+from profiling import DETAILS, FORMATS, StageProfiler, stage, summarize, write_report
+from training_cache import (
+    DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, TrainingCache,
+    cache_key, code_fingerprint, dataset_fingerprint,
 )
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor, export_text
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.cluster import KMeans
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from sklearn.neural_network import MLPClassifier
 
 import warnings
 warnings.filterwarnings('ignore')
 
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# Rows of sample_data per model unless its spec or --sample-size says otherwise
+DEFAULT_SAMPLE_SIZE = 100
+
+# Modules that shape an export besides this one; a change to any of their
+# source invalidates every cached export (see job_cache_key)
+EXPORT_MODULES = ('sampling', 'forest_export', 'knn_index', 'json_stream', 'quantize', 'inference')
+
 def export_model_to_json(model, model_type, dataset_name, scaler=None, feature_names=None):
-    """Export trained model to JSON format"""
+    """Export trained model to JSON format.
+
+    Array fields are left as NumPy arrays; write_json() streams them to disk.
+    """
+    import numpy as np
+
     model_data = {
         'type': model_type,
         'dataset': dataset_name,
         'feature_names': feature_names if feature_names is not None else []
     }
-    
+
     if model_type == 'linear_regression':
-        model_data['coefficients'] = model.coef_.tolist()
-        model_data['intercept'] = float(model.intercept_)
-        if scaler:
-            model_data['scaler_mean'] = scaler.mean_.tolist()
-            model_data['scaler_scale'] = scaler.scale_.tolist()
-    
+        model_data['coefficients'] = model.coef_
+        # SGDRegressor (streaming.py) keeps its intercept in a 1-element array
+        model_data['intercept'] = float(np.ravel(model.intercept_)[0])
+
     elif model_type == 'logistic_regression':
-        model_data['coefficients'] = model.coef_[0].tolist()
+        model_data['coefficients'] = model.coef_[0]
         model_data['intercept'] = float(model.intercept_[0])
         model_data['classes'] = model.classes_.tolist()
-        if scaler:
-            model_data['scaler_mean'] = scaler.mean_.tolist()
-            model_data['scaler_scale'] = scaler.scale_.tolist()
-    
+
     elif model_type == 'decision_tree':
         # Export tree structure
         tree = model.tree_
         model_data['tree_structure'] = {
-            'children_left': tree.children_left.tolist(),
-            'children_right': tree.children_right.tolist(),
-            'feature': tree.feature.tolist(),
-            'threshold': tree.threshold.tolist(),
-            'value': tree.value.tolist(),
-            'n_node_samples': tree.n_node_samples.tolist()
+            'children_left': tree.children_left,
+            'children_right': tree.children_right,
+            'feature': tree.feature,
+            'threshold': tree.threshold,
+            'value': tree.value,
+            'n_node_samples': tree.n_node_samples
         }
         model_data['feature_names'] = feature_names if feature_names else []
         model_data['classes'] = model.classes_.tolist() if hasattr(model, 'classes_') else None
-    
+
     elif model_type == 'random_forest':
         # Export all trees
         model_data['n_estimators'] = model.n_estimators
@@ -67,253 +88,528 @@ def export_model_to_json(model, model_type, dataset_name, scaler=None, feature_n
         for i, tree in enumerate(model.estimators_):
             t = tree.tree_
             model_data['trees'].append({
-                'children_left': t.children_left.tolist(),
-                'children_right': t.children_right.tolist(),
-                'feature': t.feature.tolist(),
-                'threshold': t.threshold.tolist(),
-                'value': t.value.tolist()
+                'children_left': t.children_left,
+                'children_right': t.children_right,
+                'feature': t.feature,
+                'threshold': t.threshold,
+                'value': t.value
             })
-    
+        # Same trees as contiguous arrays for batched inference (forest_export.py)
+        from forest_export import flatten_forest
+        model_data['flat_forest'] = flatten_forest(model)
+
     elif model_type == 'kmeans':
         model_data['n_clusters'] = model.n_clusters
-        model_data['centroids'] = model.cluster_centers_.tolist()
-        model_data['n_iter'] = int(model.n_iter_)
-    
+        model_data['centroids'] = model.cluster_centers_
+        # MiniBatchKMeans.partial_fit counts steps instead of iterations
+        model_data['n_iter'] = int(getattr(model, 'n_iter_', getattr(model, 'n_steps_', 0)))
+
     elif model_type == 'knn':
-        # For KNN, we store the training data
-        model_data['training_data'] = model._fit_X.tolist()
-        model_data['training_labels'] = model._y.tolist()
+        # Training points in KD-tree order, so each tree node owns a
+        # contiguous range; a plain scan over training_data still works
+        from knn_index import build_kd_tree
+        perm, kd_tree = build_kd_tree(model._fit_X)
+        model_data['training_data'] = model._fit_X[perm]
+        model_data['training_labels'] = model._y[perm]
+        model_data['kd_tree'] = kd_tree
         model_data['n_neighbors'] = int(model.n_neighbors)
         model_data['classes'] = model.classes_.tolist() if hasattr(model, 'classes_') else []
-    
+
     elif model_type == 'svm':
-        model_data['support_vectors'] = model.support_vectors_.tolist()
-        model_data['dual_coef'] = model.dual_coef_.tolist()
-        model_data['intercept'] = model.intercept_.tolist()
-        model_data['support'] = model.support_.tolist()
+        model_data['support_vectors'] = model.support_vectors_
+        model_data['dual_coef'] = model.dual_coef_
+        model_data['intercept'] = model.intercept_
+        model_data['support'] = model.support_
         model_data['classes'] = model.classes_.tolist()
         model_data['kernel'] = model.kernel
-    
+        # Kernel terms, so RBF inference is one matrix product per batch
+        model_data['gamma'] = float(model._gamma)
+        model_data['support_vector_norms'] = np.einsum(
+            'ij,ij->i', model.support_vectors_, model.support_vectors_)
+
     elif model_type == 'neural_network':
-        model_data['coefs'] = [coef.tolist() for coef in model.coefs_]
-        model_data['intercepts'] = [intercept.tolist() for intercept in model.intercepts_]
+        model_data['coefs'] = list(model.coefs_)
+        model_data['intercepts'] = list(model.intercepts_)
         model_data['n_layers'] = model.n_layers_
         model_data['n_outputs'] = model.n_outputs_
+        model_data['hidden_layer_sizes'] = list(model.hidden_layer_sizes)
         model_data['classes'] = model.classes_.tolist() if hasattr(model, 'classes_') else []
-    
-    return model_data
-
-# 1. LINEAR REGRESSION - California Housing
-print("Training Linear Regression on California Housing...")
-housing = fetch_california_housing()
-X, y = housing.data, housing.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler_lr = StandardScaler()
-X_train_scaled = scaler_lr.fit_transform(X_train)
-
-lr_model = LinearRegression()
-lr_model.fit(X_train_scaled, y_train)
-
-# Export sample of data
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(housing.feature_names)
-}
-
-model_data = export_model_to_json(lr_model, 'linear_regression', 'california_housing', scaler_lr, list(housing.feature_names))
-model_data['sample_data'] = sample_data
-
-with open('models/linear_regression_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"Linear Regression - R² Score: {lr_model.score(scaler_lr.transform(X_test), y_test):.4f}")
-
-# 2. LOGISTIC REGRESSION - Breast Cancer
-print("\nTraining Logistic Regression on Breast Cancer...")
-cancer = load_breast_cancer()
-X, y = cancer.data, cancer.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler_logr = StandardScaler()
-X_train_scaled = scaler_logr.fit_transform(X_train)
-
-logr_model = LogisticRegression(max_iter=1000, random_state=42)
-logr_model.fit(X_train_scaled, y_train)
-
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(cancer.feature_names)
-}
-
-model_data = export_model_to_json(logr_model, 'logistic_regression', 'breast_cancer', scaler_logr, list(cancer.feature_names))
-model_data['sample_data'] = sample_data
-
-with open('models/logistic_regression_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"Logistic Regression - Accuracy: {logr_model.score(scaler_logr.transform(X_test), y_test):.4f}")
-
-# 3. DECISION TREE - Iris Dataset
-print("\nTraining Decision Tree on Iris...")
-iris = load_iris()
-X, y = iris.data, iris.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-dt_model = DecisionTreeClassifier(max_depth=4, random_state=42)
-dt_model.fit(X_train, y_train)
-
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(iris.feature_names),
-    'target_names': list(iris.target_names)
-}
-
-model_data = export_model_to_json(dt_model, 'decision_tree', 'iris', None, list(iris.feature_names))
-model_data['sample_data'] = sample_data
-model_data['target_names'] = list(iris.target_names)
 
-with open('models/decision_tree_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
+    # Every model trained on scaled features needs the scaler to predict
+    if scaler:
+        model_data['scaler_mean'] = scaler.mean_
+        model_data['scaler_scale'] = scaler.scale_
 
-print(f"Decision Tree - Accuracy: {dt_model.score(X_test, y_test):.4f}")
-
-# 4. RANDOM FOREST - Wine Dataset
-print("\nTraining Random Forest on Wine...")
-wine = load_wine()
-X, y = wine.data, wine.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-rf_model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=42)
-rf_model.fit(X_train, y_train)
-
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(wine.feature_names),
-    'target_names': list(wine.target_names)
-}
-
-model_data = export_model_to_json(rf_model, 'random_forest', 'wine', None, list(wine.feature_names))
-model_data['sample_data'] = sample_data
-model_data['target_names'] = list(wine.target_names)
-
-with open('models/random_forest_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"Random Forest - Accuracy: {rf_model.score(X_test, y_test):.4f}")
-
-# 5. K-MEANS - Iris Dataset (for clustering)
-print("\nTraining K-Means on Iris...")
-iris = load_iris()
-X = iris.data
-scaler_kmeans = StandardScaler()
-X_scaled = scaler_kmeans.fit_transform(X)
-
-kmeans_model = KMeans(n_clusters=3, random_state=42, n_init=10)
-kmeans_model.fit(X_scaled)
-
-model_data = export_model_to_json(kmeans_model, 'kmeans', 'iris', scaler_kmeans, list(iris.feature_names))
-model_data['sample_data'] = {
-    'X': X.tolist(),
-    'labels': kmeans_model.labels_.tolist(),
-    'feature_names': list(iris.feature_names)
-}
-
-with open('models/kmeans_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"K-Means - Inertia: {kmeans_model.inertia_:.4f}")
-
-# 6. KNN - Iris Dataset
-print("\nTraining KNN on Iris...")
-iris = load_iris()
-X, y = iris.data, iris.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-knn_model = KNeighborsClassifier(n_neighbors=5)
-knn_model.fit(X_train, y_train)
-
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(iris.feature_names),
-    'target_names': list(iris.target_names)
-}
-
-model_data = export_model_to_json(knn_model, 'knn', 'iris', None, list(iris.feature_names))
-model_data['sample_data'] = sample_data
-model_data['target_names'] = list(iris.target_names)
-
-with open('models/knn_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"KNN - Accuracy: {knn_model.score(X_test, y_test):.4f}")
-
-# 7. SVM - Breast Cancer
-print("\nTraining SVM on Breast Cancer...")
-cancer = load_breast_cancer()
-X, y = cancer.data, cancer.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler_svm = StandardScaler()
-X_train_scaled = scaler_svm.fit_transform(X_train)
-
-svm_model = SVC(kernel='rbf', random_state=42, probability=True)
-svm_model.fit(X_train_scaled, y_train)
-
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(cancer.feature_names)
-}
-
-model_data = export_model_to_json(svm_model, 'svm', 'breast_cancer', scaler_svm, list(cancer.feature_names))
-model_data['sample_data'] = sample_data
-
-with open('models/svm_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"SVM - Accuracy: {svm_model.score(scaler_svm.transform(X_test), y_test):.4f}")
-
-# 8. NEURAL NETWORK - Iris Dataset
-print("\nTraining Neural Network on Iris...")
-iris = load_iris()
-X, y = iris.data, iris.target
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-scaler_nn = StandardScaler()
-X_train_scaled = scaler_nn.fit_transform(X_train)
-
-nn_model = MLPClassifier(hidden_layer_sizes=(10, 5), max_iter=1000, random_state=42)
-nn_model.fit(X_train_scaled, y_train)
+    return model_data
 
-sample_indices = np.random.choice(len(X_test), min(100, len(X_test)), replace=False)
-sample_data = {
-    'X': X_test[sample_indices].tolist(),
-    'y': y_test[sample_indices].tolist(),
-    'feature_names': list(iris.feature_names),
-    'target_names': list(iris.target_names)
+# ============================================================================
+# DATASETS
+# ============================================================================
+def load_datasets(names, cache_dir=None, synthetic=False):
+    """Load each named dataset from the offline cache (memory-mapped).
+
+    synthetic=True lets a missing California Housing be seeded with the
+    synthetic stand-in instead of failing when the download does.
+    """
+    from datasets import DEFAULT_CACHE_DIR as DEFAULT_DATASET_DIR, load_dataset
+    return {name: load_dataset(name, cache_dir or DEFAULT_DATASET_DIR, synthetic=synthetic) for name in names}
+
+def split_dataset(dataset):
+    """80/20 train/test split shared by every supervised job"""
+    from sklearn.model_selection import train_test_split
+    return train_test_split(dataset['data'], dataset['target'], test_size=0.2, random_state=42)
+
+def sample_test_data(X_test, y_test, dataset, include_target_names=False, size=DEFAULT_SAMPLE_SIZE):
+    """Seeded sample (up to `size` rows) of the test set for the visualizer.
+
+    Class labels are sampled per class (see sampling.py), so the sample keeps
+    the test set's class balance; the same inputs always give the same rows.
+    """
+    from sampling import sample_indices
+    stratify = y_test.dtype.kind in 'biu'
+    indices = sample_indices(y_test, size, stratify=stratify)
+    sample_data = {
+        'X': X_test[indices],
+        'y': y_test[indices],
+        'feature_names': dataset['feature_names']
+    }
+    if include_target_names:
+        sample_data['target_names'] = dataset['target_names']
+    return sample_data
+
+# ============================================================================
+# MODEL SPECS
+# One entry per exported model. The estimator is named by its import path so
+# reading the registry never imports scikit-learn.
+#
+#   title         label used in the summary line
+#   dataset       datasets.py name
+#   estimator     import path of the sklearn estimator class
+#   params        keyword arguments for the estimator
+#   scale         fit a StandardScaler on the training features first
+#   supervised    split train/test and score on the test set; unsupervised
+#                 models are fit on every row and scored by inertia
+#   metric        label of the score in the summary line
+#   target_names  export the dataset's class names with the model
+#   sample_size   rows of sample_data (None = every row); --sample-size overrides
+#   streaming     (import path, params) of the partial_fit estimator used by
+#                 streaming.py for out-of-core training, or None
+#   grid          {param: candidate values} searched by sweep.py, or None
+# ============================================================================
+ModelSpec = namedtuple('ModelSpec', [
+    'title', 'dataset', 'estimator', 'params', 'scale', 'supervised', 'metric', 'target_names',
+    'sample_size', 'streaming', 'grid',
+], defaults=[DEFAULT_SAMPLE_SIZE, None, None])
+
+MODEL_SPECS = {
+    'linear_regression': ModelSpec(
+        'Linear Regression', 'california_housing', 'sklearn.linear_model.LinearRegression', {},
+        scale=True, supervised=True, metric='R² Score', target_names=False,
+        streaming=('sklearn.linear_model.SGDRegressor', {'random_state': 42})),
+    'logistic_regression': ModelSpec(
+        'Logistic Regression', 'breast_cancer', 'sklearn.linear_model.LogisticRegression',
+        {'max_iter': 1000, 'random_state': 42},
+        scale=True, supervised=True, metric='Accuracy', target_names=False,
+        streaming=('sklearn.linear_model.SGDClassifier', {'loss': 'log_loss', 'random_state': 42}),
+        grid={'C': [0.01, 0.1, 1.0, 10.0]}),
+    'decision_tree': ModelSpec(
+        'Decision Tree', 'iris', 'sklearn.tree.DecisionTreeClassifier',
+        {'max_depth': 4, 'random_state': 42},
+        scale=False, supervised=True, metric='Accuracy', target_names=True,
+        grid={'max_depth': [2, 3, 4, 5, 6, 8], 'min_samples_leaf': [1, 2, 5]}),
+    'random_forest': ModelSpec(
+        'Random Forest', 'wine', 'sklearn.ensemble.RandomForestClassifier',
+        {'n_estimators': 10, 'max_depth': 5, 'random_state': 42},
+        scale=False, supervised=True, metric='Accuracy', target_names=True,
+        grid={'n_estimators': [10, 25, 50], 'max_depth': [3, 5, 8]}),
+    'kmeans': ModelSpec(
+        'K-Means', 'iris', 'sklearn.cluster.KMeans',
+        {'n_clusters': 3, 'random_state': 42, 'n_init': 10},
+        scale=True, supervised=False, metric='Inertia', target_names=False, sample_size=None,
+        streaming=('sklearn.cluster.MiniBatchKMeans', {'n_clusters': 3, 'random_state': 42, 'n_init': 3})),
+    'knn': ModelSpec(
+        'KNN', 'iris', 'sklearn.neighbors.KNeighborsClassifier', {'n_neighbors': 5},
+        scale=False, supervised=True, metric='Accuracy', target_names=True,
+        grid={'n_neighbors': [1, 3, 5, 7, 9, 15]}),
+    # probability=True makes fit() run an internal cross-validated calibration
+    'svm': ModelSpec(
+        'SVM', 'breast_cancer', 'sklearn.svm.SVC',
+        {'kernel': 'rbf', 'random_state': 42, 'probability': True},
+        scale=True, supervised=True, metric='Accuracy', target_names=False,
+        grid={'C': [0.1, 1.0, 10.0], 'gamma': ['scale', 0.01, 0.1]}),
+    'neural_network': ModelSpec(
+        'Neural Network', 'iris', 'sklearn.neural_network.MLPClassifier',
+        {'hidden_layer_sizes': (10, 5), 'max_iter': 1000, 'random_state': 42},
+        scale=True, supervised=True, metric='Accuracy', target_names=True,
+        streaming=('sklearn.neural_network.MLPClassifier', {'hidden_layer_sizes': (10, 5), 'random_state': 42}),
+        grid={'hidden_layer_sizes': [(10, 5), (20, 10), (32,)], 'alpha': [1e-4, 1e-2]}),
 }
 
-model_data = export_model_to_json(nn_model, 'neural_network', 'iris', scaler_nn, list(iris.feature_names))
-model_data['sample_data'] = sample_data
-model_data['target_names'] = list(iris.target_names)
-model_data['hidden_layer_sizes'] = list(nn_model.hidden_layer_sizes)
-
-with open('models/neural_network_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
-
-print(f"Neural Network - Accuracy: {nn_model.score(scaler_nn.transform(X_test), y_test):.4f}")
-
-print("\n[SUCCESS] All models trained and exported successfully!")
-
+def build_estimator(name, streaming=False, overrides=None):
+    """Unfitted estimator for MODEL_SPECS[name], importing only its module.
+
+    streaming=True builds the spec's partial_fit estimator instead;
+    overrides replaces some of its hyperparameters (see sweep.py).
+    """
+    spec = MODEL_SPECS[name]
+    path, params = spec.streaming if streaming else (spec.estimator, spec.params)
+    module_name, _, class_name = path.rpartition('.')
+    estimator_class = getattr(importlib.import_module(module_name), class_name)
+    return estimator_class(**dict(params, **(overrides or {})))
+
+def train_model(name, dataset, model, sample_size=None):
+    """Fit `model` as MODEL_SPECS[name] describes and export it.
+
+    sample_size, if given, replaces the spec's sample_data size. Returns
+    (model_data, summary line, (X, predictions of the fitted model on X));
+    the check pair lets run_job validate the export with inference.py.
+    """
+    spec = MODEL_SPECS[name]
+    if sample_size is None:
+        sample_size = spec.sample_size
+    if spec.supervised:
+        with stage('split'):
+            X_train, X_test, y_train, y_test = split_dataset(dataset)
+    else:
+        X_train = X_test = dataset['data']
+        y_train = None
+
+    scaler = None
+    X_train_fit, X_test_fit = X_train, X_test
+    if spec.scale:
+        from sklearn.preprocessing import StandardScaler
+        with stage('scale'):
+            scaler = StandardScaler()
+            X_train_fit = scaler.fit_transform(X_train)
+
+    with stage('fit'):
+        model.fit(X_train_fit, y_train)
+
+    with stage('score'):
+        if spec.supervised:
+            if scaler:
+                X_test_fit = scaler.transform(X_test)
+            score = model.score(X_test_fit, y_test)
+            check = (X_test, model.predict(X_test_fit))
+        else:
+            score = model.inertia_
+            check = (X_test, model.labels_)
+
+    with stage('export'):
+        model_data = export_model_to_json(model, name, spec.dataset, scaler, dataset['feature_names'])
+        # 'sklearn' or 'synthetic' (datasets.py); never publish stand-in data unlabeled
+        model_data['dataset_source'] = dataset['source']
+        if spec.supervised:
+            model_data['sample_data'] = sample_test_data(X_test, y_test, dataset, spec.target_names,
+                                                         sample_size)
+        else:
+            from sampling import sample_indices
+            indices = sample_indices(model.labels_, sample_size, stratify=True)
+            model_data['sample_data'] = {
+                'X': X_test[indices],
+                'labels': model.labels_[indices],
+                'feature_names': dataset['feature_names']
+            }
+        if spec.target_names:
+            model_data['target_names'] = dataset['target_names']
+
+    summary = f"{spec.title} - {spec.metric}: {score:.4f}"
+    if dataset['source'] == 'synthetic':
+        summary += ' [synthetic dataset]'
+    return model_data, summary, check
+
+# ============================================================================
+# ORCHESTRATION
+# ============================================================================
+
+# Datasets available to jobs in this process (set by _init_worker in the pool)
+_DATASETS = {}
+
+def _init_worker(dataset_names, cache_dir):
+    """Memory-map the cached datasets a worker's jobs need"""
+    global _DATASETS
+    _DATASETS = load_datasets(dataset_names, cache_dir)
+
+def job_cache_key(name, dataset_hash, quantize=None, sample_size=None):
+    """Cache key for a job: dataset, hyperparameters, export options, sklearn and code versions"""
+    from importlib.metadata import version
+
+    # The sweep grid (sweep.py) does not change a plain training run
+    params = {key: value for key, value in MODEL_SPECS[name]._asdict().items() if key != 'grid'}
+    if quantize:
+        params['quantize'] = list(quantize)
+    if sample_size is not None:
+        params['sample_size'] = sample_size
+    modules = [sys.modules[__name__]] + [importlib.import_module(module) for module in EXPORT_MODULES]
+    code_hash = code_fingerprint(*modules)
+    return cache_key(dataset_hash, params, version('scikit-learn'), code_hash)
+
+def output_path_for(name, output_dir):
+    return os.path.join(output_dir, f'{name}_model.json')
+
+def write_binary_exports(names, output_dir):
+    """Write a compact .bin (see binary_export.py) next to each JSON export"""
+    from binary_export import write_binary_model
+    for name in names:
+        json_path = output_path_for(name, output_dir)
+        with open(json_path) as f:
+            model_data = json.load(f)
+        size = write_binary_model(model_data, json_path[:-len('.json')] + '.bin')
+        print(f"  {name}_model.bin: {size} bytes ({os.path.getsize(json_path)} as JSON)")
+
+def approximate_svm_export(output_dir, method, budget, dataset_dir=None):
+    """Replace svm_model.json by its smallest approximation within budget.
+
+    Fields the approximation carries over unchanged (sample_data, scaler...)
+    are written back as stored, so a quantized export stays quantized;
+    `quantization` keeps listing just those fields.
+    """
+    from json_stream import write_json
+    from quantize import dequantize
+    from svm_export import approximate_export
+
+    json_path = output_path_for('svm', output_dir)
+    with open(json_path) as f:
+        stored = json.load(f)
+    model_data = dequantize(stored)
+    dataset = load_datasets([model_data['dataset']], dataset_dir)[model_data['dataset']]
+    X_train, X_test, _, _ = split_dataset(dataset)
+    approx, agreement = approximate_export(model_data, X_train, X_test, method, budget)
+    if approx is model_data:
+        print(f"  svm: no smaller {method} approximation within {budget:.1%}, kept the full export")
+        return
+    # approximate_export copies the fields it keeps by reference
+    carried = [key for key, value in approx.items() if key in model_data and value is model_data[key]]
+    for key in carried:
+        approx[key] = stored[key]
+    if 'quantization' in stored:
+        approx['quantization'] = dict(stored['quantization'], fields=[
+            field for field in stored['quantization']['fields'] if field.split('/')[0] in carried])
+    full_size = os.path.getsize(json_path)
+    write_json(approx, json_path)
+    print(f"  svm: {method} size {approx['approximation']['size']}, agreement {agreement:.2%} "
+          f"({full_size} -> {os.path.getsize(json_path)} bytes)")
+
+def run_job(name, output_dir, quantize=None, profile=None, sample_size=None):
+    """Train one model and write its JSON.
+
+    quantize is an optional (mode, digits, min_agreement) for quantize_export();
+    profile an optional (details, output_dir) for a StageProfiler; sample_size
+    overrides the spec's sample_data size. Returns
+    (name, summary, wall seconds, profiled stage records).
+    """
+    from inference import validate_export
+    from json_stream import write_json
+    from quantize import quantize_export
+
+    start = time.perf_counter()
+    profiler = StageProfiler(name, *profile) if profile else contextlib.nullcontext()
+    with profiler:
+        model_data, summary, (X_check, expected) = train_model(
+            name, _DATASETS[MODEL_SPECS[name].dataset], build_estimator(name), sample_size)
+
+        # Build-time check: the exported arrays must reproduce the fitted model
+        with stage('validate'):
+            agreement = validate_export(model_data, X_check, expected)
+        if model_data['type'] == 'linear_regression':
+            summary += f" [export max error {agreement:.2e}]"
+            if agreement > 1e-6:
+                print(f"WARNING: {name} export differs from the trained model by up to {agreement:.2e}")
+        else:
+            summary += f" [export agreement {agreement:.1%}]"
+            if agreement < 1.0:
+                print(f"WARNING: {name} export agrees with the trained model on only {agreement:.1%}")
+
+        if quantize:
+            mode, digits, min_agreement = quantize
+            with stage('quantize'):
+                agreement = quantize_export(model_data, mode, X_check, expected, min_agreement, digits)
+            summary += f" [{mode}: {len(model_data['quantization']['fields'])} fields, agreement {agreement:.1%}]"
+
+        with stage('write'):
+            write_json(model_data, output_path_for(name, output_dir))
+
+    records = profiler.records if profile else []
+    return name, summary, time.perf_counter() - start, records
+
+def run_jobs(names, output_dir=MODELS_DIR, workers=None, cache=None, dataset_dir=None,
+             quantize=None, profile=None, sample_sizes=None, synthetic=False):
+    """Run the named jobs, in a process pool unless workers == 1.
+
+    sample_sizes optionally maps model names to their sample_data size;
+    synthetic allows seeding the synthetic California Housing stand-in.
+
+    With a TrainingCache, jobs whose cache key is already stored are copied
+    from the cache instead of being trained. Returns ({name: wall seconds},
+    profiled stage records); only jobs that actually ran are profiled.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sample_sizes = sample_sizes or {}
+    dataset_names = sorted({MODEL_SPECS[name].dataset for name in names})
+    print(f"Loading datasets: {', '.join(dataset_names)}")
+    loader = StageProfiler('datasets') if profile else contextlib.nullcontext()
+    with loader, stage('load'):
+        datasets = load_datasets(dataset_names, dataset_dir, synthetic)
+    records = list(loader.records) if profile else []
+
+    timings = {}
+    keys = {}
+    pending = []
+    if cache is not None:
+        dataset_hashes = {name: dataset_fingerprint(datasets[name]) for name in dataset_names}
+        for name in names:
+            start = time.perf_counter()
+            keys[name] = job_cache_key(name, dataset_hashes[MODEL_SPECS[name].dataset], quantize,
+                                       sample_sizes.get(name))
+            if cache.fetch(keys[name], output_path_for(name, output_dir)):
+                timings[name] = time.perf_counter() - start
+                print(f"{name}: unchanged, reused cached export ({timings[name]:.2f}s)")
+            else:
+                pending.append(name)
+    else:
+        pending = list(names)
+
+    def finish(name, summary, elapsed, job_records):
+        print(f"{summary} ({elapsed:.2f}s)")
+        timings[name] = elapsed
+        records.extend(job_records)
+        if cache is not None:
+            cache.store(keys[name], output_path_for(name, output_dir))
+
+    if not pending:
+        return timings, records
+
+    if workers == 1:
+        _init_worker(dataset_names, dataset_dir)
+        for name in pending:
+            print(f"\nTraining {name}...")
+            finish(*run_job(name, output_dir, quantize, profile, sample_sizes.get(name)))
+        return timings, records
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    print(f"Training {len(pending)} models on {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dataset_names, dataset_dir)) as pool:
+        futures = [pool.submit(run_job, name, output_dir, quantize, profile, sample_sizes.get(name))
+                   for name in pending]
+        for future in as_completed(futures):
+            finish(*future.result())
+    return timings, records
+
+def _sample_size(value):
+    """--sample-size value: N for every model, or MODEL=N"""
+    model, _, size = value.rpartition('=')
+    if model and model not in MODEL_SPECS:
+        raise argparse.ArgumentTypeError(f"unknown model {model!r}")
+    try:
+        size = int(size)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected N or MODEL=N, got {value!r}")
+    if size < 1:
+        raise argparse.ArgumentTypeError('sample size must be at least 1')
+    return model or None, size
+
+def parse_args(argv=None):
+    from quantize import DEFAULT_MIN_AGREEMENT
+    from svm_export import APPROXIMATIONS, DEFAULT_BUDGET
+
+    parser = argparse.ArgumentParser(description='Train ML models and export them for the visualizer')
+    parser.add_argument('--only', nargs='+', choices=list(MODEL_SPECS), metavar='MODEL',
+                        help=f"train only these models ({', '.join(MODEL_SPECS)})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per CPU, 1 = no pool)')
+    parser.add_argument('--output-dir', default=MODELS_DIR,
+                        help='directory for the exported JSON files (default: models/)')
+    parser.add_argument('--binary', action='store_true',
+                        help='also write compact .bin exports next to the JSON files')
+    parser.add_argument('--dataset-dir', default=None,
+                        help='offline dataset cache (default: .dataset_cache/)')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='if California Housing cannot be downloaded, seed a synthetic stand-in '
+                             '(exports record dataset_source: synthetic)')
+    parser.add_argument('--sample-size', type=_sample_size, action='append', default=[],
+                        metavar='[MODEL=]N',
+                        help=f'rows of sample_data for every model, or one model (repeatable, '
+                             f'default: {DEFAULT_SAMPLE_SIZE}, every row for kmeans)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='retrain every model even if its inputs are unchanged')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='training cache directory (default: .model_cache/)')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='evict least recently used cache entries past this size (default: 50)')
+    precision = parser.add_mutually_exclusive_group()
+    precision.add_argument('--precision', type=int, metavar='DIGITS',
+                           help='round exported floats to this many significant digits')
+    precision.add_argument('--quantize', choices=['float16', 'int8'],
+                           help='store exported floats as float16 values or int8 codes with scale/offset')
+    parser.add_argument('--min-agreement', type=float, default=DEFAULT_MIN_AGREEMENT,
+                        help='keep a field at lower precision only while predictions agree this often (default: 0.99)')
+    parser.add_argument('--svm-approx', choices=APPROXIMATIONS,
+                        help='shrink the SVM export to a reduced set or random Fourier features')
+    parser.add_argument('--svm-budget', type=float, default=DEFAULT_BUDGET,
+                        help='fraction of SVM predictions the approximation may flip (default: 0.01)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='record wall/CPU time and peak memory of every training stage to PATH')
+    parser.add_argument('--profile-format', choices=FORMATS, default='json',
+                        help='plain JSON, or a Chrome trace for chrome://tracing / Perfetto (default: json)')
+    parser.add_argument('--profile-detail', action='append', choices=DETAILS, default=[],
+                        help='also dump a cProfile or tracemalloc report per model (repeatable)')
+    parser.add_argument('--profile-dir', default='profiles',
+                        help='directory for --profile-detail dumps (default: profiles/)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.only or list(MODEL_SPECS)
+
+    start = time.perf_counter()
+    cache = None
+    if not args.no_cache:
+        cache = TrainingCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    from quantize import DEFAULT_DIGITS
+
+    quantize = None
+    if args.precision:
+        quantize = ('digits', args.precision, args.min_agreement)
+    elif args.quantize:
+        quantize = (args.quantize, DEFAULT_DIGITS, args.min_agreement)
+    profile = None
+    if args.profile or args.profile_detail:
+        profile = (args.profile_detail, args.profile_dir)
+        if cache is not None:
+            print("Note: models reused from the training cache are not profiled (use --no-cache)")
+    sample_sizes = {}
+    for model, size in args.sample_size:
+        sample_sizes.update({name: size for name in ([model] if model else names)})
+    timings, records = run_jobs(names, args.output_dir, args.workers, cache, args.dataset_dir,
+                                quantize, profile, sample_sizes, args.synthetic)
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            print(f"Evicted {evicted} stale cache entries")
+    if args.svm_approx and 'svm' in names:
+        print("\nApproximating the SVM export...")
+        approximate_svm_export(args.output_dir, args.svm_approx, args.svm_budget, args.dataset_dir)
+    if args.binary:
+        print("\nWriting binary exports...")
+        write_binary_exports(names, args.output_dir)
+    total = time.perf_counter() - start
+
+    print("\nPer-job wall time:")
+    for name in names:
+        print(f"  {name:<20} {timings[name]:7.2f}s")
+    print(f"  {'total':<20} {total:7.2f}s")
+
+    if records:
+        print("\nStages:")
+        print(summarize(records))
+    if args.profile:
+        write_report(records, args.profile, args.profile_format)
+        print(f"Stage profile written to {args.profile}")
+
+    print("\n[SUCCESS] All models trained and exported successfully!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Content-addressed cache of exported models
+
+A cache key is the SHA-256 of everything that determines a model export:
+the dataset fingerprint, the estimator's hyperparameters, the scikit-learn
+version and the source of the code that trains and exports it. When a key
+is already in the cache the stored JSON is reused instead of refitting.
+
+Entries are plain files named <key>.json in the cache directory. Hits
+refresh an entry's mtime, and the least recently used entries are evicted
+once the directory grows past its size cap.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.model_cache')
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+def dataset_fingerprint(dataset):
+    """Hash of a dataset's arrays (values, dtype and shape) and names"""
+    digest = hashlib.sha256()
+    for key in ('data', 'target'):
+        array = dataset[key]
+        digest.update(f'{key}:{array.dtype.str}:{array.shape}'.encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps([dataset['feature_names'], dataset['target_names']]).encode())
+    return digest.hexdigest()
+
+def code_fingerprint(*objects):
+    """Hash of the source code of the given functions or whole modules"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()
+
+def cache_key(dataset_hash, params, sklearn_version, code_hash):
+    """Combine every input of a model export into a single key"""
+    payload = json.dumps({
+        'dataset': dataset_hash,
+        'params': params,
+        'sklearn': sklearn_version,
+        'code': code_hash,
+    }, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class TrainingCache:
+    """Directory of exported model files keyed by cache_key()"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def fetch(self, key, output_path):
+        """Copy a cached export to output_path; returns False on a miss"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return False
+        shutil.copyfile(path, output_path)
+        # Mark as recently used for eviction
+        os.utime(path)
+        return True
+
+    def store(self, key, output_path):
+        """Add a freshly written export to the cache, then enforce the size cap"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes.
+
+        Returns the number of entries removed.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            removed += 1
+        return removed